@@ -0,0 +1,382 @@
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import shutil
+import sys
+import tempfile
+import time
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, unquote, urlsplit
+import job_tracker
+from exporter import EXPORT_FORMATS, run_export
+from instrumentation import timed
+
+# Local only by default; dashboards and scripts run on the same machine
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# A login token stays valid this long after its last use
+SESSION_TTL_SECONDS = 8 * 60 * 60
+
+# Requests larger than this are refused
+MAX_BODY_BYTES = 1024 * 1024
+
+# Search results are paged; a page holds at most this many rows
+MAX_PAGE_ROWS = 1000
+
+EXPORT_CONTENT_TYPES = {
+    'xlsx': "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    'csv': "text/csv; charset=utf-8",
+    'pdf': "application/pdf",
+}
+
+
+# Raised by handlers to answer with an error status and message
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+# A request that could not be read as far as its end; whatever follows on
+# the connection cannot be trusted, so the connection is closed after the reply
+class MalformedRequest(ApiError):
+    pass
+
+
+# token -> [username, expiry]; checked instead of re-hashing the password
+class SessionStore:
+    def __init__(self, ttl=SESSION_TTL_SECONDS):
+        self.ttl = ttl
+        self._sessions = {}
+
+    def create(self, username):
+        token = secrets.token_urlsafe(32)
+        self._sessions[token] = [username, time.monotonic() + self.ttl]
+        return token
+
+    # Username for a live token (extending it), or None
+    def resolve(self, token):
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        if session[1] < time.monotonic():
+            del self._sessions[token]
+            return None
+        session[1] = time.monotonic() + self.ttl
+        return session[0]
+
+    def revoke(self, token):
+        self._sessions.pop(token, None)
+
+
+# One parsed HTTP request
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+
+    def json(self):
+        try:
+            data = json.loads(self.body or b"{}")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Body must be JSON")
+        if not isinstance(data, dict):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Body must be a JSON object")
+        return data
+
+    def param(self, name, default=""):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+    def token(self):
+        scheme, _, token = self.headers.get("authorization", "").partition(" ")
+        return token.strip() if scheme.lower() == "bearer" else ""
+
+
+# Read one request from the stream, or None when the client closed it
+async def read_request(reader):
+    request_line = await reader.readline()
+    if not request_line.strip():
+        return None
+    try:
+        method, target, _ = request_line.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise MalformedRequest(HTTPStatus.BAD_REQUEST, "Malformed request line")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise MalformedRequest(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length < 0:
+        raise MalformedRequest(HTTPStatus.BAD_REQUEST, "Invalid Content-Length")
+    if length > MAX_BODY_BYTES:
+        raise MalformedRequest(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body too large")
+    body = await reader.readexactly(length) if length else b""
+
+    url = urlsplit(target)
+    return Request(method.upper(), unquote(url.path), parse_qs(url.query), headers, body)
+
+
+def encode_response(status, body, content_type, keep_alive, extra_headers=()):
+    status = HTTPStatus(status)
+    headers = [
+        f"HTTP/1.1 {status.value} {status.phrase}",
+        f"Content-Type: {content_type}",
+        f"Content-Length: {len(body)}",
+        f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        *extra_headers,
+    ]
+    return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+
+def json_body(data):
+    return json.dumps(data).encode("utf-8")
+
+
+# Rows of a DataFrame as JSON-ready dicts keyed by column name
+def frame_records(frame):
+    return [dict(zip(frame.columns, map(str, row))) for row in frame.itertuples(index=False, name=None)]
+
+
+# Asyncio HTTP front end over the same store and password checks as the GUI.
+# The dataset stays loaded in the store; blocking store calls run on the
+# event loop's thread pool so many clients are served at once.
+class TrackerApi:
+    def __init__(self, store=None):
+        self.store = store or job_tracker.open_application_store()
+        self.sessions = SessionStore()
+        self.routes = {
+            ("POST", "/login"): self.login,
+            ("POST", "/logout"): self.logout,
+            ("GET", "/applications"): self.search,
+            ("POST", "/applications"): self.add,
+            ("DELETE", "/applications"): self.delete,
+            ("PATCH", "/applications"): self.update_status,
+            ("GET", "/changes"): self.changes,
+            ("GET", "/stats"): self.stats,
+            ("GET", "/export"): self.export,
+        }
+
+    # Run a blocking call off the event loop
+    async def run(self, fn, *args, **kwargs):
+        return await asyncio.get_running_loop().run_in_executor(None, partial(fn, *args, **kwargs))
+
+    def user(self, request):
+        username = self.sessions.resolve(request.token())
+        if username is None:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Log in first")
+        return username
+
+    # POST /login {"username", "password"} -> {"token"}
+    async def login(self, request, argument):
+        data = request.json()
+        username, password = str(data.get("username", "")).strip(), str(data.get("password", ""))
+        if not username or not password:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Both username and password are required")
+        try:
+            verified = await self.run(job_tracker.authenticate, username, password)
+        except FileNotFoundError:
+            verified = None
+        if not verified:
+            raise ApiError(HTTPStatus.UNAUTHORIZED, "Invalid username or password")
+        return {"token": self.sessions.create(username), "expires_in": self.sessions.ttl}
+
+    async def logout(self, request, argument):
+        self.user(request)
+        self.sessions.revoke(request.token())
+        return {"logged_out": True}
+
+    # GET /applications?company=&position=&status=&date_from=&date_to=&offset=&limit=
+    async def search(self, request, argument):
+        username = self.user(request)
+        try:
+            offset = max(0, int(request.param("offset", "0")))
+            limit = min(MAX_PAGE_ROWS, max(1, int(request.param("limit", str(MAX_PAGE_ROWS)))))
+            rows = await self.run(self.store.search, username, request.param("company"),
+                                  request.param("date_from") or None, request.param("date_to") or None,
+                                  position=request.param("position"), status=request.param("status"))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Dates must be YYYY-MM-DD; offset and limit must be numbers")
+        return {"total": len(rows), "offset": offset, "applications": frame_records(rows.iloc[offset:offset + limit])}
+
+    # POST /applications {"company", "position", "date_applied", "status"} -> {"id"}
+    async def add(self, request, argument):
+        from job_store import APPLICATION_STATUSES, ID_COLUMN
+
+        username = self.user(request)
+        data = request.json()
+        record = {
+            "User Name": username,
+            "Company": str(data.get("company", "")).strip(),
+            "Position": str(data.get("position", "")).strip(),
+            "Date Applied": str(data.get("date_applied", "")).strip(),
+            "Status": str(data.get("status", "Applied")).strip(),
+        }
+        if not all(record.values()):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "company, position and date_applied are required")
+        if record["Status"] not in APPLICATION_STATUSES:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"status must be one of {', '.join(APPLICATION_STATUSES)}")
+        try:
+            time.strptime(record["Date Applied"], "%Y-%m-%d")
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "date_applied must be YYYY-MM-DD")
+        # The same company, position and date again is refused unless allow_duplicate is true
+        ids = await self.run(self.store.append_many, [record], not data.get("allow_duplicate"))
+        if ids[0] is None:
+            raise ApiError(HTTPStatus.CONFLICT, "An application with the same company, position and date exists")
+        return {ID_COLUMN: ids[0]}
+
+    # DELETE /applications/<id>
+    async def delete(self, request, argument):
+        username = self.user(request)
+        if not argument:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Use DELETE /applications/<id>")
+        removed = await self.run(self.store.delete, username, argument)
+        if not removed:
+            raise ApiError(HTTPStatus.NOT_FOUND, "No such application")
+        return {"deleted": removed}
+
+    # PATCH /applications/<id> {"status"}
+    async def update_status(self, request, argument):
+        from job_store import APPLICATION_STATUSES
+
+        username = self.user(request)
+        status = str(request.json().get("status", "")).strip()
+        if not argument:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Use PATCH /applications/<id>")
+        if status not in APPLICATION_STATUSES:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"status must be one of {', '.join(APPLICATION_STATUSES)}")
+        if not await self.run(self.store.update_status, username, argument, status):
+            raise ApiError(HTTPStatus.NOT_FOUND, "No such application")
+        return {"updated": 1}
+
+    # GET /changes?since=N -> your adds, status changes and deletes after sequence N
+    async def changes(self, request, argument):
+        username = self.user(request)
+        try:
+            since = int(request.param("since", "0"))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "since must be a number")
+        changes, latest = await self.run(self.store.changes_since, username, since)
+        return {"changes": changes, "sequence": latest}
+
+    # GET /stats -> status totals and cumulative weekly counts per status
+    async def stats(self, request, argument):
+        username = self.user(request)
+        progression, status_counts = await self.run(self.store_statistics, username)
+        return {
+            "status_counts": {status: int(count) for status, count in status_counts.items()},
+            "weeks": [week.strftime("%Y-%m-%d") for week in progression.index],
+            "cumulative": {status: progression[status].astype(int).tolist() for status in progression.columns},
+        }
+
+    def store_statistics(self, username):
+        statistics = self.store.statistics(username)
+        return statistics.progression(), statistics.status_counts()
+
+    # GET /export?format=csv|xlsx|pdf -> the exported file
+    async def export(self, request, argument):
+        username = self.user(request)
+        extension = request.param("format", "csv")
+        if extension not in EXPORT_FORMATS:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"format must be one of {', '.join(EXPORT_FORMATS)}")
+        body = await self.run(self.export_bytes, username, extension)
+        filename = f"{username}_job_applications.{extension}"
+        return body, EXPORT_CONTENT_TYPES[extension], [f'Content-Disposition: attachment; filename="{filename}"']
+
+    def export_bytes(self, username, extension):
+        directory = tempfile.mkdtemp(prefix="tracker-api-export-")
+        try:
+            written = run_export(self.store.user_rows(username), os.path.join(directory, "export"), [extension],
+                                 parallel=False)
+            with open(written[0], "rb") as f:
+                return f.read()
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    # Route a request: "/applications/<id>" passes <id> as the argument
+    async def dispatch(self, request):
+        resource, _, argument = request.path.strip("/").partition("/")
+        handler = self.routes.get((request.method, "/" + resource))
+        if handler is None:
+            raise ApiError(HTTPStatus.NOT_FOUND, f"No route for {request.method} {request.path}")
+        with timed(f"api {request.method} /{resource}"):
+            return await handler(request, argument)
+
+    # Serve requests on one connection until the client closes it
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                keep_alive = True
+                extra_headers = ()
+                try:
+                    request = await read_request(reader)
+                    if request is None:
+                        break
+                    keep_alive = request.headers.get("connection", "").lower() != "close"
+                    result = await self.dispatch(request)
+                    if isinstance(result, tuple):
+                        body, content_type, extra_headers = result
+                    else:
+                        body, content_type = json_body(result), "application/json"
+                    status = HTTPStatus.OK
+                except MalformedRequest as e:
+                    # The unread body would be taken for the next request
+                    keep_alive = False
+                    status, body, content_type = e.status, json_body({"error": e.message}), "application/json"
+                except ApiError as e:
+                    status, body, content_type = e.status, json_body({"error": e.message}), "application/json"
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except Exception as e:
+                    status, body, content_type = (HTTPStatus.INTERNAL_SERVER_ERROR, json_body({"error": str(e)}),
+                                                  "application/json")
+                writer.write(encode_response(status, body, content_type, keep_alive, extra_headers))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        # Load the dataset before accepting clients so the first request is
+        # fast, unless the store is in low-memory mode
+        await self.run(self.store.initialize)
+        if getattr(self.store, "memory_limit", None) is None:
+            await self.run(self.store.refresh)
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Job tracker API listening on http://{host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the job tracker as a local JSON HTTP API.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(TrackerApi().serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+import queue
+import threading
+import tkinter
+from concurrent.futures import ThreadPoolExecutor
+import ttkbootstrap as ttk
+from ttkbootstrap.constants import *
+
+# How often the Tk thread collects finished work
+POLL_INTERVAL_MS = 50
+
+
+# Raised inside a task once its CancelToken has been cancelled
+class TaskCancelled(Exception):
+    pass
+
+
+# Cooperative cancellation flag handed to long-running tasks
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    # Call between steps of a task to stop early once cancelled
+    def check(self):
+        if self._event.is_set():
+            raise TaskCancelled()
+
+
+# Runs blocking work (file I/O, exports, chart building) on worker threads
+# and hands results back to the Tk thread, which polls a queue through
+# root.after. Tasks submitted on the same channel supersede each other:
+# only the result of the newest one is delivered.
+class BackgroundRunner:
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job-tracker")
+        self._results = queue.Queue()
+        self._generations = {}
+        self.root.after(POLL_INTERVAL_MS, self._poll)
+
+    # Run fn(*args, **kwargs) off the Tk thread. on_done(result) or
+    # on_error(exception) is then called on the Tk thread.
+    def submit(self, fn, *args, on_done=None, on_error=None, channel=None, **kwargs):
+        generation = None
+        if channel is not None:
+            generation = self._generations.get(channel, 0) + 1
+            self._generations[channel] = generation
+
+        future = self._executor.submit(fn, *args, **kwargs)
+        future.add_done_callback(
+            lambda done: self._results.put((self._deliver, (done, on_done, on_error, channel, generation))))
+        return future
+
+    # Thread-safe: schedule callback(*args) on the Tk thread
+    def post(self, callback, *args):
+        self._results.put((callback, args))
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _deliver(self, future, on_done, on_error, channel, generation):
+        # A newer task on the same channel has superseded this one
+        if channel is not None and self._generations.get(channel) != generation:
+            return
+        if future.cancelled():
+            return
+
+        error = future.exception()
+        if error is None:
+            if on_done is not None:
+                on_done(future.result())
+        elif isinstance(error, TaskCancelled):
+            pass
+        elif on_error is not None:
+            on_error(error)
+        else:
+            self.root.report_callback_exception(type(error), error, error.__traceback__)
+
+    def _poll(self):
+        while True:
+            try:
+                callback, args = self._results.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                callback(*args)
+            except tkinter.TclError:
+                # The window the result was meant for has been closed
+                pass
+        self.root.after(POLL_INTERVAL_MS, self._poll)
+
+
+# Small modal-less window with a progress bar and a Cancel button
+class ProgressDialog:
+    def __init__(self, parent, title, runner):
+        self.runner = runner
+        self.token = CancelToken()
+
+        self.window = ttk.Toplevel(parent)
+        self.window.title(title)
+        self.window.geometry("400x140")
+        self.window.protocol("WM_DELETE_WINDOW", self.cancel)
+
+        self.label = ttk.Label(self.window, text="Working...")
+        self.label.pack(pady=(15, 5))
+
+        self.progress = ttk.Progressbar(self.window, maximum=1.0, length=340, bootstyle=SUCCESS)
+        self.progress.pack(pady=5)
+
+        ttk.Button(self.window, text="Cancel", command=self.cancel, bootstyle=SECONDARY).pack(pady=5)
+
+    # Thread-safe progress update; fraction runs from 0.0 to 1.0
+    def report(self, fraction, message=None):
+        self.token.check()
+        self.runner.post(self._update, fraction, message)
+
+    def _update(self, fraction, message):
+        self.progress['value'] = fraction
+        if message:
+            self.label.config(text=message)
+
+    def cancel(self):
+        self.token.cancel()
+        self.close()
+
+    def close(self):
+        try:
+            self.window.destroy()
+        except tkinter.TclError:
+            pass
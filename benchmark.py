@@ -0,0 +1,248 @@
+import argparse
+import base64
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import columnar_cache
+import job_tracker
+from exporter import EXPORT_FORMATS, run_export
+from credential_store import CREDENTIAL_COLUMNS, CsvCredentialStore
+from job_store import APPLICATION_STATUSES, STORED_COLUMNS, ApplicationStore
+
+# Synthetic companies and positions are drawn from pools of this size
+COMPANY_POOL = 5000
+POSITIONS = ["Software Engineer", "Data Scientist", "Product Manager", "Designer",
+             "DevOps Engineer", "QA Engineer", "Data Analyst", "Support Engineer"]
+
+# Every synthetic user has this password, so login can be timed
+BENCHMARK_PASSWORD = "benchmark-password"
+
+# Applications fall on days in this range
+FIRST_DATE = np.datetime64("2022-01-01")
+DATE_SPAN_DAYS = 3 * 365
+
+
+def user_name(number):
+    return f"user{number:05d}"
+
+
+# Write job_applications.csv and credentials.csv with `rows` applications
+# spread over `users` users. The same seed always gives the same files.
+def generate_dataset(directory, rows, users, seed=0):
+    rng = np.random.default_rng(seed)
+    os.makedirs(directory, exist_ok=True)
+    csv_path = os.path.join(directory, "job_applications.csv")
+    credentials_path = os.path.join(directory, "credentials.csv")
+
+    # A few heavy users and a long tail, like real usage
+    weights = 1.0 / np.arange(1, users + 1) ** 0.8
+    user_numbers = rng.choice(users, size=rows, p=weights / weights.sum())
+    companies = np.char.add("Company ", rng.integers(0, COMPANY_POOL, size=rows).astype(str))
+    dates = FIRST_DATE + rng.integers(0, DATE_SPAN_DAYS, size=rows).astype("timedelta64[D]")
+    applications = pd.DataFrame({
+        "User Name": np.vectorize(user_name)(user_numbers),
+        "Company": companies,
+        "Position": np.array(POSITIONS)[rng.integers(0, len(POSITIONS), size=rows)],
+        "Date Applied": np.datetime_as_string(dates, unit="D"),
+        "Status": np.array(APPLICATION_STATUSES)[rng.choice(len(APPLICATION_STATUSES), size=rows,
+                                                            p=[0.6, 0.2, 0.15, 0.05])],
+        "Application ID": [f"{value:032x}" for value in rng.integers(0, 2 ** 63, size=rows)],
+    }, columns=STORED_COLUMNS)
+    applications.to_csv(csv_path, index=False)
+
+    credentials = []
+    for number in range(users):
+        salt, password_hash = job_tracker.hash_password(BENCHMARK_PASSWORD, rng.bytes(16))
+        credentials.append([user_name(number), base64.b64encode(salt).decode("utf-8"),
+                            base64.b64encode(password_hash).decode("utf-8")])
+    pd.DataFrame(credentials, columns=CREDENTIAL_COLUMNS).to_csv(credentials_path, index=False)
+    return csv_path, credentials_path
+
+
+# Run fn `repeat` times and summarize the wall-clock times in milliseconds.
+# setup() runs before each call, untimed, and its result is passed to fn.
+def measure(fn, repeat, setup=None):
+    timings = []
+    for _ in range(repeat):
+        arguments = (setup(),) if setup else ()
+        start = time.perf_counter()
+        fn(*arguments)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        "repeat": repeat,
+        "min_ms": round(min(timings), 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "mean_ms": round(statistics.fmean(timings), 3),
+        "max_ms": round(max(timings), 3),
+    }
+
+
+# Time a fresh interpreter importing job_tracker, i.e. everything that
+# happens before the login window can be built
+def measure_startup(repeat):
+    command = [sys.executable, "-c", "import job_tracker"]
+    directory = os.path.dirname(os.path.abspath(__file__))
+    return measure(lambda: subprocess.run(command, cwd=directory, check=True), repeat)
+
+
+# Time the work behind each tracker operation against the given files.
+# Returns (dataset description, {operation: timing summary}).
+def run_benchmarks(csv_path, credentials_path, repeat=5, export_repeat=1, user=None):
+    store = ApplicationStore(csv_path)
+    credential_store = CsvCredentialStore(credentials_path)
+    # The GUI helpers read these module globals
+    job_tracker.application_store = store
+    job_tracker.credential_store = credential_store
+
+    results = {}
+    results["startup_import"] = measure_startup(repeat)
+    results["load"] = measure(lambda store_copy: store_copy.refresh(), repeat,
+                              setup=lambda: ApplicationStore(csv_path))
+    store.refresh()
+
+    # A first load: parse the CSV and build the columnar cache
+    def uncached_store():
+        columnar_cache.remove_cache(csv_path)
+        return ApplicationStore(csv_path)
+
+    if columnar_cache.available():
+        results["load_uncached"] = measure(lambda store_copy: store_copy.refresh(), repeat, setup=uncached_store)
+
+    # The heaviest user is the worst case for every per-user operation
+    user = user or max(store.users(), key=lambda name: len(store.user_positions(name)))
+    results["history"] = measure(lambda: store.user_rows(user), repeat)
+    # An unfiltered search first, so each timed search starts from scratch
+    # instead of narrowing the previous one
+    clear_search = lambda: store.search(user)
+    results["search_company"] = measure(lambda _: store.search(user, company="Company 12"), repeat,
+                                        setup=clear_search)
+    results["search_dates"] = measure(lambda _: store.search(user, date_from="2023-01-01", date_to="2023-06-30"),
+                                      repeat, setup=clear_search)
+    results["search_combined"] = measure(
+        lambda _: store.search(user, company="ny 4", date_from="2022-06-01", date_to="2023-12-31"), repeat,
+        setup=clear_search)
+    results["search_status_position"] = measure(
+        lambda _: store.search(user, position="engineer", status="Interview"), repeat, setup=clear_search)
+    # Typing one more character narrows the previous result
+    results["search_narrowing"] = measure(lambda _: store.search(user, company="Company 12"), repeat,
+                                          setup=lambda: store.search(user, company="Company 1"))
+
+    added_ids = []
+    record = {"User Name": user, "Company": "Benchmark Corp", "Position": POSITIONS[0],
+              "Date Applied": "2024-01-15", "Status": "Applied"}
+    results["add"] = measure(lambda: added_ids.append(store.append(record)), repeat)
+    results["delete"] = measure(lambda application_id: store.delete(user, application_id), repeat,
+                                setup=added_ids.pop)
+    results["duplicate_check"] = measure(lambda: store.duplicates_of(record), repeat)
+
+    results["statistics"] = measure(lambda: job_tracker.load_statistics(user), repeat)
+    figure = Figure(figsize=(16, 6))
+    FigureCanvasAgg(figure)
+    progression, status_counts = job_tracker.load_statistics(user)
+    results["chart"] = measure(lambda: (job_tracker.draw_statistics(figure, user, progression, status_counts),
+                                        figure.canvas.draw()), repeat)
+
+    export_directory = tempfile.mkdtemp(prefix="tracker-export-")
+    try:
+        base_filename = os.path.join(export_directory, "export")
+        for extension in EXPORT_FORMATS:
+            results[f"export_{extension}"] = measure(
+                lambda: run_export(store.user_rows(user), base_filename, [extension], parallel=False),
+                export_repeat)
+    finally:
+        shutil.rmtree(export_directory, ignore_errors=True)
+
+    results["login"] = measure(lambda: job_tracker.authenticate(user, BENCHMARK_PASSWORD), repeat)
+    dataset = {
+        "rows": len(store.df),
+        "users": len(store.users()),
+        "benchmark_user": user,
+        "benchmark_user_rows": len(store.user_positions(user)),
+    }
+    return dataset, results
+
+
+# Median change per operation between two result files, as text lines
+def compare_results(baseline, current):
+    lines = []
+    for operation, result in current["results"].items():
+        before = baseline["results"].get(operation)
+        if before is None:
+            lines.append(f"{operation:22} {result['median_ms']:>10.3f} ms  (new)")
+            continue
+        change = (result["median_ms"] - before["median_ms"]) / before["median_ms"] * 100 if before["median_ms"] else 0.0
+        lines.append(f"{operation:22} {before['median_ms']:>10.3f} -> {result['median_ms']:>10.3f} ms  ({change:+.1f}%)")
+    return lines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the tracker's operations on synthetic data (no display needed).")
+    parser.add_argument("--rows", type=int, default=100000, help="applications to generate (up to about 1M)")
+    parser.add_argument("--users", type=int, default=1000, help="users to generate (up to about 10k)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=5, help="runs per operation")
+    parser.add_argument("--export-repeat", type=int, default=1, help="runs per export format")
+    parser.add_argument("--data-dir", help="generate into (or reuse with --reuse-data) this directory")
+    parser.add_argument("--reuse-data", action="store_true", help="use the files already in --data-dir")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    data_directory = args.data_dir or tempfile.mkdtemp(prefix="tracker-bench-")
+    try:
+        if args.reuse_data:
+            csv_path = os.path.join(data_directory, "job_applications.csv")
+            credentials_path = os.path.join(data_directory, "credentials.csv")
+        else:
+            start = time.perf_counter()
+            csv_path, credentials_path = generate_dataset(data_directory, args.rows, args.users, args.seed)
+            print(f"Generated {args.rows} rows for {args.users} users in {time.perf_counter() - start:.1f}s")
+
+        dataset, results = run_benchmarks(csv_path, credentials_path, args.repeat, args.export_repeat)
+    finally:
+        if not args.data_dir:
+            shutil.rmtree(data_directory, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **dataset,
+            "seed": args.seed,
+            "startup_target_ms": job_tracker.STARTUP_TARGET_SECONDS * 1000,
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for operation, result in results.items():
+        print(f"{operation:22} median {result['median_ms']:>10.3f} ms")
+    print(f"Results written to {args.output}")
+    if results["startup_import"]["median_ms"] > job_tracker.STARTUP_TARGET_SECONDS * 1000:
+        print(f"Startup is over the {job_tracker.STARTUP_TARGET_SECONDS}s target")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.compare}:")
+        print("\n".join(compare_results(baseline, report)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+import argparse
+import os
+import sys
+import numpy as np
+import pandas as pd
+from job_store import APPLICATION_COLUMNS, APPLICATION_STATUSES, DATE_FORMAT
+
+# Rows read and validated at a time
+IMPORT_CHUNK_ROWS = 10000
+
+# File extensions read as one JSON object per line
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+
+
+# "csv" or "jsonl", from the file extension unless given
+def import_format(path, file_format=None):
+    if file_format is not None:
+        return file_format
+    return "jsonl" if os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS else "csv"
+
+
+# Read an import file in chunks of plain strings
+def read_import_chunks(path, file_format=None, chunk_rows=IMPORT_CHUNK_ROWS):
+    file_format = import_format(path, file_format)
+    if file_format == "csv":
+        reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+    elif file_format == "jsonl":
+        reader = pd.read_json(path, lines=True, dtype=False, chunksize=chunk_rows)
+    else:
+        raise ValueError(f"Unknown import format: {file_format}")
+
+    with reader:
+        for chunk in reader:
+            yield chunk.fillna("").astype(str)
+
+
+# Split a chunk into importable rows and rejected rows, using whole-column
+# operations only. Both keep their line number; rejected rows get a Reason.
+# first_line is the file line of the chunk's first row.
+def validate_chunk(chunk, first_line, username=None):
+    chunk = chunk.copy()
+    if username is not None:
+        # Rows without a User Name (a blank cell, or a JSON line without the key) are the user's
+        if "User Name" not in chunk.columns:
+            chunk["User Name"] = username
+        chunk["User Name"] = chunk["User Name"].fillna(username).astype(str).str.strip().replace("", username)
+    if "Status" not in chunk.columns:
+        chunk["Status"] = "Applied"
+    # Blank Status cells default as well, not just a missing column
+    chunk["Status"] = chunk["Status"].fillna("Applied").astype(str).str.strip().replace("", "Applied")
+    missing_columns = [col for col in APPLICATION_COLUMNS if col not in chunk.columns]
+    if missing_columns:
+        raise ValueError(f"Import file is missing columns: {', '.join(missing_columns)}")
+
+    rows = chunk[APPLICATION_COLUMNS].apply(lambda column: column.str.strip())
+    rows.insert(0, "Line", np.arange(first_line, first_line + len(rows)))
+
+    dates = pd.to_datetime(rows["Date Applied"], format=DATE_FORMAT, errors="coerce")
+    conditions = [rows[col] == "" for col in APPLICATION_COLUMNS]
+    reasons = [f"{col} is empty" for col in APPLICATION_COLUMNS]
+    if username is not None:
+        conditions.append(rows["User Name"] != username)
+        reasons.append(f"User Name is not {username}")
+    conditions += [dates.isna(), ~rows["Status"].isin(APPLICATION_STATUSES)]
+    reasons += ["Date Applied is not YYYY-MM-DD", "Status is not one of " + ", ".join(APPLICATION_STATUSES)]
+
+    reason = pd.Series(np.select(conditions, reasons, default=""), index=rows.index)
+    accepted = reason == ""
+
+    valid = rows.loc[accepted, ["Line"] + APPLICATION_COLUMNS]
+    valid["Date Applied"] = dates[accepted].dt.strftime(DATE_FORMAT)
+    rejected = rows.loc[~accepted].assign(Reason=reason[~accepted])
+    return valid, rejected
+
+
+# Validate a whole file chunk by chunk, then add every valid row with one
+# write to the store. Returns (number imported, DataFrame of rejected rows).
+# With username set, rows may omit User Name and must not name anyone else.
+# Rows that duplicate a saved application or an earlier row (same user,
+# company, position and date) are rejected unless allow_duplicates is set.
+def import_applications(store, path, file_format=None, username=None, chunk_rows=IMPORT_CHUNK_ROWS,
+                        allow_duplicates=False):
+    file_format = import_format(path, file_format)
+    # CSV data starts on line 2, after the header
+    first_line = 1 if file_format == "jsonl" else 2
+
+    valid_chunks, rejected_chunks = [], []
+    for chunk in read_import_chunks(path, file_format, chunk_rows):
+        valid, rejected = validate_chunk(chunk, first_line, username)
+        first_line += len(chunk)
+        valid_chunks.append(valid)
+        rejected_chunks.append(rejected)
+
+    valid = pd.concat(valid_chunks) if valid_chunks else pd.DataFrame(columns=["Line"] + APPLICATION_COLUMNS)
+    rejected = (pd.concat(rejected_chunks) if rejected_chunks
+                else pd.DataFrame(columns=["Line"] + APPLICATION_COLUMNS + ["Reason"]))
+
+    imported = 0
+    if len(valid):
+        store.initialize()
+        ids = store.append_many(valid[APPLICATION_COLUMNS].to_dict("records"), skip_duplicates=not allow_duplicates)
+        skipped = np.array([application_id is None for application_id in ids])
+        imported = int((~skipped).sum())
+        if skipped.any():
+            duplicates = valid[skipped].assign(Reason="Duplicate of a saved application or an earlier row")
+            rejected = pd.concat([rejected, duplicates]).sort_values("Line", kind="stable")
+    return imported, rejected
+
+
+def main(argv=None, store=None):
+    parser = argparse.ArgumentParser(description="Bulk-import job applications from a CSV or JSONL file.")
+    parser.add_argument("path", help="CSV with a header row, or JSONL with one application per line")
+    parser.add_argument("--format", choices=["csv", "jsonl"], help="default: from the file extension")
+    parser.add_argument("--user", help="import for this user; rows may then omit User Name")
+    parser.add_argument("--rejects", help="write rejected rows and reasons to this CSV file")
+    parser.add_argument("--chunk-rows", type=int, default=IMPORT_CHUNK_ROWS)
+    parser.add_argument("--allow-duplicates", action="store_true",
+                        help="also import rows with the same user, company, position and date as another")
+    args = parser.parse_args(argv)
+
+    if store is None:
+        from job_store import open_storage
+        store, _ = open_storage(os.environ.get("JOB_TRACKER_BACKEND", "csv"), "job_applications.csv",
+                                "credentials.csv", "job_tracker.db")
+
+    imported, rejected = import_applications(store, args.path, args.format, args.user, args.chunk_rows,
+                                             args.allow_duplicates)
+    print(f"Imported {imported} applications, rejected {len(rejected)}")
+    if len(rejected):
+        if args.rejects:
+            rejected.to_csv(args.rejects, index=False)
+            print(f"Rejected rows written to {args.rejects}")
+        else:
+            for row in rejected.head(20).itertuples(index=False):
+                print(f"  line {row.Line}: {row.Reason}")
+            if len(rejected) > 20:
+                print(f"  ... and {len(rejected) - 20} more (use --rejects to save them all)")
+    return 1 if len(rejected) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+import hashlib
+import logging
+import os
+
+# pyarrow is optional; without it every load parses the CSV
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+
+# The cache of <csv> is <csv><CACHE_SUFFIX>
+CACHE_SUFFIX = ".feather"
+
+# Date Applied parsed to timestamps, stored next to the original text
+PARSED_DATE_COLUMN = "Date Applied (parsed)"
+
+# Caches written with another format are rebuilt; raised when what the
+# cache holds changes (2: legacy date formats parsed, not left as NaT)
+CACHE_FORMAT = b"2"
+
+logger = logging.getLogger(__name__)
+
+
+def available():
+    return pa is not None
+
+
+def cache_path(csv_path):
+    return csv_path + CACHE_SUFFIX
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _csv_identity(csv_path):
+    stat = os.stat(csv_path)
+    return {b"csv_mtime_ns": str(stat.st_mtime_ns).encode(), b"csv_size": str(stat.st_size).encode()}
+
+
+# Write the table and its parsed dates to the sidecar cache of csv_path.
+# Categorical columns are stored dictionary-encoded and come back as
+# categoricals. The CSV's mtime, size and SHA-256 go into the file's
+# schema metadata.
+def write_cache(csv_path, frame, dates):
+    if pa is None:
+        return
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    table = table.append_column(PARSED_DATE_COLUMN, pa.array(dates, type=pa.timestamp("ns"), from_pandas=True))
+    metadata = dict(table.schema.metadata or {})
+    metadata.update(_csv_identity(csv_path))
+    metadata[b"csv_sha256"] = file_digest(csv_path).encode()
+    metadata[b"cache_format"] = CACHE_FORMAT
+    table = table.replace_schema_metadata(metadata)
+
+    # Uncompressed so the file can be memory-mapped instead of decoded
+    temp_path = cache_path(csv_path) + ".tmp"
+    feather.write_feather(table, temp_path, compression="uncompressed")
+    os.replace(temp_path, cache_path(csv_path))
+
+
+# (frame, parsed dates) from the cache, or None when there is no cache or
+# it no longer matches the CSV or CACHE_FORMAT. A changed mtime with the same size falls
+# back to comparing hashes, so touching the CSV does not force a rebuild.
+def read_cache(csv_path):
+    if pa is None or not os.path.exists(cache_path(csv_path)):
+        return None
+    try:
+        with pa.memory_map(cache_path(csv_path)) as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            if metadata.get(b"cache_format") != CACHE_FORMAT:
+                return None
+            identity = _csv_identity(csv_path)
+            touched = any(metadata.get(key) != value for key, value in identity.items())
+            if touched and (metadata.get(b"csv_size") != identity[b"csv_size"] or
+                            metadata.get(b"csv_sha256") != file_digest(csv_path).encode()):
+                return None
+            table = reader.read_all()
+    except (OSError, pa.ArrowInvalid) as e:
+        logger.warning("%s: ignoring unreadable cache (%s)", cache_path(csv_path), e)
+        return None
+
+    dates = table.column(PARSED_DATE_COLUMN).to_numpy().astype("datetime64[ns]")
+    frame = table.drop_columns([PARSED_DATE_COLUMN]).to_pandas()
+
+    # Same content under a new mtime: store the new mtime to skip hashing next time
+    if touched:
+        write_cache(csv_path, frame, dates)
+    return frame, dates
+
+
+def remove_cache(csv_path):
+    try:
+        os.remove(cache_path(csv_path))
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,134 @@
+import csv
+import io
+import os
+import threading
+from file_lock import LOCK_SUFFIX, FileLock
+
+# Columns written to the credentials CSV
+CREDENTIAL_COLUMNS = ["Username", "Salt", "PasswordHash"]
+
+# Storage backends selectable by name; "csv" keeps everything in the two CSV files
+STORAGE_BACKENDS = ("csv", "sqlite", "sharded")
+
+
+# Append rows to a CSV file, writing the header if the file is new,
+# and fsync so the rows survive a crash right after the call returns
+def append_csv_rows(path, columns, rows):
+    write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+    missing_newline = False
+    if not write_header:
+        with open(path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            missing_newline = f.read(1) not in (b"\n", b"\r")
+
+    with open(path, "a", newline="", encoding="utf-8") as f:
+        if missing_newline:
+            f.write("\n")
+        writer = csv.writer(f)
+        if write_header:
+            writer.writerow(columns)
+        writer.writerows(rows)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+# Username -> salt/hash lookups backed by the credentials CSV. Reads and
+# registrations from every process are serialized by an advisory file lock.
+# Uses only the csv module so the login screen does not wait for pandas.
+# The file is indexed into a dict once; when it has only grown (the usual
+# case, registrations append) just the new rows are read.
+class CsvCredentialStore:
+    def __init__(self, path):
+        self.path = path
+        self._file_lock = FileLock(path + LOCK_SUFFIX)
+        self._lock = threading.Lock()
+        # username -> (salt, hash) as stored (base64 text)
+        self._index = {}
+        self._columns = None
+        # (inode, mtime, size) of the indexed file, and the bytes indexed so far
+        self._signature = None
+        self._offset = 0
+
+    def _file_signature(self):
+        stat = os.stat(self.path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+    # Index rows from byte offset on; offset 0 starts over from the header
+    def _read_from(self, offset):
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        if offset == 0:
+            self._index = {}
+            self._columns = None
+        rows = csv.reader(io.StringIO(data.decode("utf-8"), newline=""))
+        if self._columns is None:
+            header = next(rows, None)
+            if header is None:
+                return offset
+            self._columns = [header.index(col) for col in CREDENTIAL_COLUMNS]
+        user_col, salt_col, hash_col = self._columns
+        for row in rows:
+            if len(row) > max(self._columns):
+                # The first row for a name wins, as with a top-down scan
+                self._index.setdefault(row[user_col], (row[salt_col], row[hash_col]))
+        return offset + len(data)
+
+    # Bring the index up to date; needs at least the shared file lock.
+    # Raises FileNotFoundError when nobody has registered yet.
+    def _refresh(self):
+        signature = self._file_signature()
+        if signature == self._signature:
+            return
+        grown = (self._signature is not None and signature[0] == self._signature[0]
+                 and signature[2] > self._offset)
+        self._offset = self._read_from(self._offset if grown else 0)
+        self._signature = signature
+
+    # (salt, hash) as stored (base64 text) for a user, or None if unknown.
+    # Raises FileNotFoundError when nobody has registered yet.
+    def lookup(self, username):
+        with self._lock, self._file_lock.shared():
+            self._refresh()
+            return self._index.get(username)
+
+    def exists(self, username):
+        try:
+            return self.lookup(username) is not None
+        except FileNotFoundError:
+            return False
+
+    # Register a user unless the name is taken. The check and the append
+    # happen under one exclusive lock, so two processes cannot both claim
+    # the same name. Returns True if the user was added.
+    def add(self, username, salt, password_hash):
+        with self._lock, self._file_lock.exclusive():
+            try:
+                self._refresh()
+            except FileNotFoundError:
+                pass
+            if username in self._index:
+                return False
+            # Follow the file's own header; older files have an extra Password column
+            header = self._header() or CREDENTIAL_COLUMNS
+            record = dict(zip(CREDENTIAL_COLUMNS, (username, salt, password_hash)))
+            append_csv_rows(self.path, header, [[record.get(col, "") for col in header]])
+        return True
+
+    def _header(self):
+        try:
+            with open(self.path, newline="", encoding="utf-8") as f:
+                return next(csv.reader(f), None)
+        except FileNotFoundError:
+            return None
+
+
+# Build the credential store for a backend
+def open_credential_store(backend, credentials_path, database_path):
+    # Sharding only splits the applications; credentials stay in one CSV
+    if backend in ("csv", "sharded"):
+        return CsvCredentialStore(credentials_path)
+    if backend == "sqlite":
+        from sqlite_store import SqliteCredentialStore
+        return SqliteCredentialStore(database_path)
+    raise ValueError(f"Unknown storage backend: {backend!r} (expected one of {', '.join(STORAGE_BACKENDS)})")
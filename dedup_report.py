@@ -0,0 +1,88 @@
+import argparse
+import os
+import sys
+import pandas as pd
+from job_store import ID_COLUMN, STORED_COLUMNS, application_key
+
+# Duplicate groups printed in the summary; --output lists all of them
+EXAMPLE_GROUPS = 10
+
+
+# Every application that shares its user and application_key with another,
+# in file order, with the group it belongs to ("Duplicate Group", numbered
+# from 1 in order of first appearance) and whether it is the group's first
+# copy ("Keep")
+def find_duplicates(applications):
+    applications = applications[STORED_COLUMNS].astype(str).reset_index(drop=True)
+    keys = pd.DataFrame([application_key(*values) for values in
+                         zip(applications["Company"], applications["Position"], applications["Date Applied"])],
+                        columns=["company_key", "position_key", "date_key"], index=applications.index)
+    keys.insert(0, "user", applications["User Name"])
+    duplicated = keys.duplicated(keep=False).to_numpy()
+
+    duplicates = applications[duplicated]
+    groups = keys[duplicated].groupby(list(keys.columns), sort=False).ngroup() + 1
+    return duplicates.assign(**{"Duplicate Group": groups.to_numpy(),
+                                "Keep": ~keys[duplicated].duplicated(keep="first").to_numpy()})
+
+
+# Delete every copy but the first of each group. When the copies disagree on
+# Status, the kept copy takes the Status of the last one, the newest entry.
+# Returns the number of rows deleted.
+def merge_duplicates(store, duplicates):
+    removed = 0
+    for _, group in duplicates.groupby("Duplicate Group", sort=False):
+        kept = group.iloc[0]
+        if group["Status"].iloc[-1] != kept["Status"]:
+            store.update_status(kept["User Name"], kept[ID_COLUMN], group["Status"].iloc[-1])
+        for username, application_id in zip(group["User Name"].iloc[1:], group[ID_COLUMN].iloc[1:]):
+            removed += store.delete(username, application_id)
+    return removed
+
+
+def format_summary(duplicates, total):
+    if not len(duplicates):
+        return f"No duplicates among {total} applications"
+    groups = duplicates["Duplicate Group"].nunique()
+    extra = len(duplicates) - groups
+    lines = [f"{extra} extra copies in {groups} groups of duplicates among {total} applications, "
+             f"for {duplicates['User Name'].nunique()} users", ""]
+    for number, (_, group) in enumerate(duplicates.groupby("Duplicate Group", sort=False)):
+        if number == EXAMPLE_GROUPS:
+            lines.append(f"  ... and {groups - EXAMPLE_GROUPS} more groups (use --output to list them all)")
+            break
+        first = group.iloc[0]
+        companies = " / ".join(sorted(set(map(repr, group["Company"]))))
+        lines.append(f"  {first['User Name']}: {companies}, {first['Position']}, {first['Date Applied']} "
+                     f"x{len(group)}")
+    return "\n".join(lines)
+
+
+def main(argv=None, store=None):
+    parser = argparse.ArgumentParser(description="Report applications saved more than once: the same user, "
+                                                 "company, position and date, ignoring case and surrounding "
+                                                 "spaces in the company and position.")
+    parser.add_argument("--output", help="write every duplicate row, with its group, to this CSV file")
+    parser.add_argument("--merge", action="store_true",
+                        help="keep only the first copy of each group, with the Status of the newest copy")
+    args = parser.parse_args(argv)
+
+    if store is None:
+        from job_store import open_application_store
+        store = open_application_store(os.environ.get("JOB_TRACKER_BACKEND", "csv"), "job_applications.csv",
+                                       "job_tracker.db")
+    applications = store.df
+    duplicates = find_duplicates(applications)
+    print(format_summary(duplicates, len(applications)))
+
+    if args.output:
+        duplicates.to_csv(args.output, index=False)
+        print(f"Duplicate rows written to {args.output}")
+    if args.merge and len(duplicates):
+        removed = merge_duplicates(store, duplicates)
+        print(f"Removed {removed} extra copies")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,135 @@
+import argparse
+import csv
+import json
+import os
+import sys
+from job_store import ID_COLUMN, STORED_COLUMNS
+
+# Columns of a delta file: one row per change, oldest first. A status change
+# fills in just Status, a delete just the Application ID.
+DELTA_COLUMNS = ["Sequence", "Change", "Changed At"] + STORED_COLUMNS
+
+
+# Delta rows for change-log entries
+def delta_rows(changes):
+    for change in changes:
+        values = dict(zip(STORED_COLUMNS, change["row"])) if change["op"] == "add" else {ID_COLUMN: change["id"]}
+        if change["op"] == "status":
+            values["Status"] = change["status"]
+        yield [change["seq"], change["op"], change.get("time", "")] + [values.get(col, "") for col in STORED_COLUMNS]
+
+
+def write_delta(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(DELTA_COLUMNS)
+        writer.writerows(rows)
+
+
+# Write the changes to a user's applications after sequence `since` to path.
+# With since=None the delta holds all of the user's current applications as
+# adds, so applied to nothing it gives a full export.
+# Returns (changes written, sequence to pass as since next time).
+def export_delta(store, username, path, since=None):
+    if since is None:
+        rows, latest = store.change_snapshot(username)
+        changes = [{"seq": latest, "op": "add", "row": list(row)}
+                   for row in rows[STORED_COLUMNS].astype(str).itertuples(index=False, name=None)]
+    else:
+        changes, latest = store.changes_since(username, since)
+    write_delta(path, delta_rows(changes))
+    return len(changes), latest
+
+
+# Apply a delta file to an earlier CSV export (a missing file counts as
+# empty) and write the result to output_path: rows are added, have their
+# Status changed or are removed by Application ID, keeping export order.
+# Returns {change: count}.
+def apply_delta(export_path, delta_path, output_path):
+    columns, rows = STORED_COLUMNS, {}
+    if os.path.exists(export_path):
+        with open(export_path, newline="", encoding="utf-8") as f:
+            reader = csv.DictReader(f)
+            columns = reader.fieldnames or STORED_COLUMNS
+            if ID_COLUMN not in columns:
+                raise ValueError(f"{export_path} has no {ID_COLUMN} column; start from a full delta export")
+            rows = {row[ID_COLUMN]: row for row in reader}
+
+    counts = {"add": 0, "status": 0, "delete": 0}
+    with open(delta_path, newline="", encoding="utf-8") as f:
+        for change in csv.DictReader(f):
+            application_id = change[ID_COLUMN]
+            if change["Change"] == "add":
+                rows[application_id] = {col: change.get(col, "") for col in columns}
+            elif change["Change"] == "status" and application_id in rows:
+                rows[application_id]["Status"] = change["Status"]
+            elif change["Change"] == "delete":
+                rows.pop(application_id, None)
+            else:
+                continue
+            counts[change["Change"]] += 1
+
+    temp_path = f"{output_path}.tmp"
+    with open(temp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows.values())
+    os.replace(temp_path, output_path)
+    return counts
+
+
+# The sequence a checkpoint file recorded, or None if there is no file yet
+def read_checkpoint(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)["sequence"]
+    except FileNotFoundError:
+        return None
+
+
+def write_checkpoint(path, sequence):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"sequence": sequence}, f)
+    os.replace(temp_path, path)
+
+
+def main(argv=None, store=None):
+    parser = argparse.ArgumentParser(description="Export only the changes since the last export, "
+                                                 "or apply such a delta to an earlier CSV export.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export_parser = commands.add_parser("export", help="write a user's changes since a sequence number")
+    export_parser.add_argument("--user", required=True)
+    export_parser.add_argument("--output", required=True, help="delta CSV to write")
+    export_parser.add_argument("--since", type=int, help="last sequence already exported")
+    export_parser.add_argument("--checkpoint", help="JSON file that remembers the sequence between runs; "
+                                                    "without one the first delta holds every application")
+
+    apply_parser = commands.add_parser("apply", help="apply a delta to an earlier CSV export")
+    apply_parser.add_argument("export", help="earlier CSV export (may not exist yet)")
+    apply_parser.add_argument("delta")
+    apply_parser.add_argument("--output", help="default: update the export in place")
+    args = parser.parse_args(argv)
+
+    if args.command == "apply":
+        counts = apply_delta(args.export, args.delta, args.output or args.export)
+        print(f"Applied {counts['add']} adds, {counts['status']} status changes and {counts['delete']} deletes")
+        return 0
+
+    if store is None:
+        from job_store import open_application_store
+        store = open_application_store(os.environ.get("JOB_TRACKER_BACKEND", "csv"), "job_applications.csv",
+                                       "job_tracker.db")
+    since = args.since
+    if since is None and args.checkpoint:
+        since = read_checkpoint(args.checkpoint)
+    count, latest = export_delta(store, args.user, args.output, since)
+    if args.checkpoint:
+        write_checkpoint(args.checkpoint, latest)
+    print(f"Wrote {count} changes to {args.output}; next export starts after sequence {latest}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+import csv
+import multiprocessing
+import os
+import queue
+import time
+from instrumentation import record, timed
+
+# Export formats in the order they are offered: extension -> display name
+EXPORT_FORMATS = {
+    'xlsx': 'Excel',
+    'csv': 'CSV',
+    'pdf': 'PDF',
+}
+
+# Rows handed to a writer at a time
+EXPORT_CHUNK_ROWS = 5000
+
+# Rows per PDF page (letter, 12pt header, 10pt body)
+PDF_ROWS_PER_PAGE = 30
+
+# Below this many rows, starting worker processes costs more than it saves
+PARALLEL_EXPORT_MIN_ROWS = 5000
+
+# A format is written under its name plus this suffix and renamed once
+# complete, so a cancelled export never leaves a partial file behind
+PARTIAL_SUFFIX = ".part"
+
+# How often a parallel export checks for Cancel while its workers run
+CANCEL_POLL_SECONDS = 0.1
+
+
+# Split a DataFrame into row chunks without copying it up front
+def iter_chunks(frame, chunk_rows=EXPORT_CHUNK_ROWS):
+    for start in range(0, len(frame), chunk_rows):
+        yield frame.iloc[start:start + chunk_rows]
+
+
+# Re-cut a stream of chunks into lists of exactly `size` rows (last may be short)
+def _iter_row_batches(chunks, size):
+    batch = []
+    for chunk in chunks:
+        for row in chunk.itertuples(index=False, name=None):
+            batch.append([str(value) for value in row])
+            if len(batch) == size:
+                yield batch
+                batch = []
+    if batch:
+        yield batch
+
+
+# CSV: header, then each chunk appended as it arrives
+def write_csv(columns, chunks, path):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for chunk in chunks:
+            writer.writerows(chunk.itertuples(index=False, name=None))
+
+
+# Excel: openpyxl write-only mode streams rows to disk instead of
+# keeping a cell object per value
+def write_xlsx(columns, chunks, path):
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(columns)
+    try:
+        for chunk in chunks:
+            for row in chunk.itertuples(index=False, name=None):
+                sheet.append(list(row))
+    except BaseException:
+        # End the sheet's row stream, which openpyxl cannot do for a dropped sheet
+        sheet.close()
+        raise
+    workbook.save(path)
+
+
+# PDF: one small table per page drawn straight onto the canvas, so
+# neither memory nor layout time grows with one huge Table
+def write_pdf(columns, chunks, path):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.pdfgen.canvas import Canvas
+    from reportlab.platypus import Table, TableStyle
+    from reportlab.lib import colors
+    from reportlab.lib.units import inch
+
+    style = TableStyle([
+        ('BACKGROUND', (0,0), (-1,0), colors.grey),
+        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
+        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
+        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0,0), (-1,0), 12),
+        ('BOTTOMPADDING', (0,0), (-1,0), 12),
+        ('BACKGROUND', (0,1), (-1,-1), colors.beige),
+        ('GRID', (0,0), (-1,-1), 1, colors.black)
+    ])
+
+    page_width, page_height = letter
+    margin = inch
+    canvas = Canvas(path, pagesize=letter)
+
+    pages = _iter_row_batches(chunks, PDF_ROWS_PER_PAGE)
+    for page_rows in _chain_first(next(pages, []), pages):
+        table = Table([columns] + page_rows)
+        table.setStyle(style)
+        width, height = table.wrapOn(canvas, page_width - 2 * margin, page_height - 2 * margin)
+        table.drawOn(canvas, max(margin, (page_width - width) / 2), page_height - margin - height)
+        canvas.showPage()
+    canvas.save()
+
+
+# Always emit at least one page, even for an empty export
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+
+_WRITERS = {
+    'xlsx': write_xlsx,
+    'csv': write_csv,
+    'pdf': write_pdf,
+}
+
+
+# Pass chunks through, calling check_cancel() before each one
+def _checked(chunks, check_cancel):
+    for chunk in chunks:
+        if check_cancel is not None:
+            check_cancel()
+        yield chunk
+
+
+def _remove_partial(full_filename):
+    try:
+        os.remove(full_filename + PARTIAL_SUFFIX)
+    except FileNotFoundError:
+        pass
+
+
+# Write one format through its partial file, renamed over full_filename
+# once complete; a writer that fails or is cancelled leaves nothing behind
+def _write_format(extension, columns, chunks, full_filename, check_cancel=None):
+    try:
+        _WRITERS[extension](columns, _checked(chunks, check_cancel), full_filename + PARTIAL_SUFFIX)
+    except BaseException:
+        _remove_partial(full_filename)
+        raise
+    os.replace(full_filename + PARTIAL_SUFFIX, full_filename)
+
+
+# Write one format from a DataFrame; runs in a worker process
+def export_format(extension, frame, base_filename, check_cancel=None):
+    full_filename = f"{base_filename}.{extension}"
+    _write_format(extension, frame.columns.tolist(), iter_chunks(frame), full_filename, check_cancel)
+    return full_filename
+
+
+# Write the selected formats, in parallel worker processes when the export
+# is large enough to benefit. progress(fraction, message) is called after
+# each finished format and may raise to stop the export. check_cancel()
+# is called before each chunk (and, in parallel, while waiting for the
+# workers) and raises to stop it; running workers are then terminated.
+def run_export(frame, base_filename, extensions, progress=None, parallel=None, check_cancel=None):
+    extensions = [extension for extension in EXPORT_FORMATS if extension in extensions]
+    if parallel is None:
+        parallel = (len(extensions) > 1 and len(frame) >= PARALLEL_EXPORT_MIN_ROWS
+                    and (os.cpu_count() or 1) > 1)
+
+    written = []
+    if not parallel:
+        for extension in extensions:
+            if progress:
+                progress(len(written) / len(extensions), f"Writing {EXPORT_FORMATS[extension]}...")
+            with timed(f"export_{extension}", rows=len(frame)):
+                written.append(export_format(extension, frame, base_filename, check_cancel))
+    else:
+        # "spawn" keeps Tk and the worker threads out of the child processes
+        context = multiprocessing.get_context("spawn")
+        workers = min(len(extensions), os.cpu_count() or 1)
+        start = time.perf_counter()
+        # (extension, file written or None, exception or None) per finished format
+        finished = queue.Queue()
+        pool = context.Pool(workers)
+        try:
+            for extension in extensions:
+                pool.apply_async(export_format, (extension, frame, base_filename),
+                                 callback=lambda filename, extension=extension: finished.put(
+                                     (extension, filename, None)),
+                                 error_callback=lambda error, extension=extension: finished.put(
+                                     (extension, None, error)))
+            while len(written) < len(extensions):
+                try:
+                    extension, filename, error = finished.get(timeout=CANCEL_POLL_SECONDS)
+                except queue.Empty:
+                    if check_cancel is not None:
+                        check_cancel()
+                    continue
+                if error is not None:
+                    raise error
+                written.append(filename)
+                # Formats overlap here, so each is timed from the start of the export
+                record(f"export_{extension}", (time.perf_counter() - start) * 1000, len(frame))
+                if progress:
+                    progress(len(written) / len(extensions), f"Finished {EXPORT_FORMATS[extension]}")
+        except BaseException:
+            # Stop the formats still being written; a terminated worker
+            # cannot remove its partial file, so that is done here
+            pool.terminate()
+            pool.join()
+            for extension in extensions:
+                _remove_partial(f"{base_filename}.{extension}")
+            raise
+        pool.close()
+        pool.join()
+
+    if progress:
+        progress(1.0, "Done")
+    return written
+
+
+# Pass chunks through while counting their rows into sample.rows
+def _counted(chunks, sample):
+    sample.rows = 0
+    for chunk in chunks:
+        sample.rows += len(chunk)
+        yield chunk
+
+
+# Write the selected formats from chunks instead of a DataFrame, one format
+# after the other in this process. open_chunks() starts a fresh stream for
+# each format, so only one chunk is held at a time however large the export.
+# check_cancel() is called before each chunk, as in run_export.
+def run_streaming_export(columns, open_chunks, base_filename, extensions, progress=None, check_cancel=None):
+    extensions = [extension for extension in EXPORT_FORMATS if extension in extensions]
+    written = []
+    for extension in extensions:
+        if progress:
+            progress(len(written) / len(extensions), f"Writing {EXPORT_FORMATS[extension]}...")
+        full_filename = f"{base_filename}.{extension}"
+        with timed(f"export_{extension}") as sample:
+            _write_format(extension, list(columns), _counted(open_chunks(), sample), full_filename, check_cancel)
+        written.append(full_filename)
+    if progress:
+        progress(1.0, "Done")
+    return written
@@ -0,0 +1,59 @@
+import contextlib
+import os
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: msvcrt only has exclusive locks, so shared() locks exclusively too
+    fcntl = None
+    import msvcrt
+
+# Lock files sit next to the file they protect: <path><LOCK_SUFFIX>
+LOCK_SUFFIX = ".lock"
+
+
+# Advisory lock shared by every process that opens the same lock file.
+# Readers take shared(), writers take exclusive(). Nested use inside the
+# same object is allowed, except asking for exclusive() while holding shared().
+class FileLock:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+
+    def _held(self):
+        return getattr(self._local, "held", None)
+
+    @contextlib.contextmanager
+    def _acquire(self, exclusive):
+        held = self._held()
+        if held is not None:
+            if exclusive and held == "shared":
+                raise RuntimeError(f"{self.path}: cannot upgrade a shared lock to exclusive")
+            yield
+            return
+
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            else:
+                msvcrt.locking(fd, msvcrt.LK_LOCK, 1)
+            self._local.held = "exclusive" if exclusive else "shared"
+            try:
+                yield
+            finally:
+                self._local.held = None
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_UN)
+                else:
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(fd)
+
+    def shared(self):
+        return self._acquire(exclusive=False)
+
+    def exclusive(self):
+        return self._acquire(exclusive=True)
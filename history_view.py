@@ -0,0 +1,265 @@
+import ttkbootstrap as ttk
+from instrumentation import timed
+
+# Fallbacks when the theme does not report Treeview metrics
+DEFAULT_ROW_HEIGHT = 20
+HEADING_HEIGHT = 25
+
+
+# Integer keys that order a column's values case-insensitively, so sorting
+# compares integers instead of strings. A categorical column ranks its few
+# categories once and looks the ranks up by code.
+def sort_keys(values):
+    if values.dtype == "category":
+        ranks = values.cat.categories.str.lower().to_numpy().argsort(kind="stable").argsort()
+        return ranks[values.cat.codes.to_numpy()]
+    return values.astype(str).str.lower().factorize(sort=True)[0]
+
+
+# Treeview that only materializes the rows currently on screen.
+# The full result stays in a DataFrame; scrolling, paging and refreshes
+# diff the visible window against the items already in the widget, so
+# each update touches at most a screenful of Tk items.
+# Item ids come from key_column when given, otherwise from the index.
+# In paged mode (show_paged) not even the full result is held: the table
+# keeps one page of rows and asks for another when the view leaves it.
+class VirtualHistoryTable:
+    def __init__(self, parent, columns, key_column=None):
+        self.columns = list(columns)
+        self.key_column = key_column
+        self.frame = ttk.Frame(parent)
+
+        body = ttk.Frame(self.frame)
+        body.pack(fill='both', expand=True)
+
+        self.tree = ttk.Treeview(body, columns=self.columns, show="headings")
+        for col in self.columns:
+            self.tree.heading(col, text=col, command=lambda col=col: self.sort_by(col))
+            self.tree.column(col, anchor="center", width=150)
+
+        self.scrollbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side='right', fill='y')
+        self.tree.pack(side='left', fill='both', expand=True)
+
+        self.status_label = ttk.Label(self.frame, text="")
+        self.status_label.pack(anchor='e', pady=(5, 0))
+
+        # Rows as given to show(), and as displayed (sorted if a sort is active)
+        self._source = None
+        self._frame = None
+        # Active sort as (column, descending), or None for the given order
+        self._sort = None
+        # Sort keys and row orders of the current rows, computed on first use
+        self._sort_keys = {}
+        self._sort_orders = {}
+        self._offset = 0
+        self._visible = 20
+        # iid -> values currently shown in the widget
+        self._rendered = {}
+        # Paged mode: load_page(offset) fetches rows around offset and answers
+        # through show_page; _frame then holds rows _page_start onwards of _total
+        self._load_page = None
+        self._page_start = 0
+        self._total = 0
+        self._requested = None
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(3))
+        self.tree.bind("<Prior>", lambda event: self._scroll_key(-self._visible))
+        self.tree.bind("<Next>", lambda event: self._scroll_key(self._visible))
+        self.tree.bind("<Control-Home>", lambda event: self._scroll_key(-self.row_count()))
+        self.tree.bind("<Control-End>", lambda event: self._scroll_key(self.row_count()))
+        self.tree.bind("<Up>", self._on_arrow_up)
+        self.tree.bind("<Down>", self._on_arrow_down)
+
+    def pack(self, **kwargs):
+        self.frame.pack(**kwargs)
+
+    def row_count(self):
+        if self._load_page is not None:
+            return self._total
+        return 0 if self._frame is None else len(self._frame)
+
+    # Replace the rows being displayed. key_column (or the DataFrame index)
+    # provides the item ids, so rows that stay on screen are left untouched.
+    # An active column sort is kept and applied to the new rows.
+    def show(self, frame, keep_position=True):
+        self._load_page = None
+        self._source = frame
+        self._sort_keys = {}
+        self._sort_orders = {}
+        self._frame = self._sorted(frame)
+        if not keep_position:
+            self._offset = 0
+        with timed("treeview_fill", rows=self.row_count()):
+            self._render()
+
+    # Page through rows that are not held in memory. load_page(offset) must
+    # fetch rows from around offset on, off the Tk thread, and hand them to
+    # show_page. The rows on screen stay until the first page arrives.
+    def show_paged(self, load_page, keep_position=True):
+        self._load_page = load_page
+        self._source = None
+        if not keep_position:
+            self._offset = 0
+        self._requested = self._offset
+        load_page(self._offset)
+
+    # Rows start to start + len(page) of total rows, answering load_page
+    def show_page(self, total, start, page):
+        if self._load_page is None:
+            return
+        self._total, self._page_start, self._frame = total, start, page
+        self._requested = None
+        with timed("treeview_fill", rows=len(page)):
+            self._render()
+
+    # Sort by a column (a heading click): ascending first, then toggling.
+    # Paged rows are never all at hand, so they cannot be sorted.
+    def sort_by(self, column):
+        if self._load_page is not None:
+            self.status_label.config(text="Sorting is not available in low-memory mode")
+            return
+        descending = self._sort == (column, False)
+        self._sort = (column, descending)
+        for col in self.columns:
+            arrow = (" ▼" if descending else " ▲") if col == column else ""
+            self.tree.heading(col, text=col + arrow)
+        if self._source is None:
+            return
+        with timed("sort", rows=self.row_count()):
+            self._frame = self._sorted(self._source)
+            self._offset = 0
+            self._render()
+
+    def _sorted(self, frame):
+        if self._sort is None or frame is None:
+            return frame
+        if self._sort not in self._sort_orders:
+            column, descending = self._sort
+            if column not in self._sort_keys:
+                self._sort_keys[column] = sort_keys(frame[column])
+            keys = self._sort_keys[column]
+            # Stable in both directions, so ties keep the given order
+            self._sort_orders[self._sort] = (-keys if descending else keys).argsort(kind="stable")
+        return frame.iloc[self._sort_orders[self._sort]]
+
+    # Values of a row that is currently on screen
+    def item(self, iid):
+        return self.tree.item(iid)
+
+    def selection(self):
+        return self.tree.selection()
+
+    def scroll(self, rows):
+        self._offset += rows
+        self._render()
+
+    def _scroll_key(self, rows):
+        self.scroll(rows)
+        return "break"
+
+    def _clamp_offset(self):
+        max_offset = max(0, self.row_count() - self._visible)
+        self._offset = min(max(0, self._offset), max_offset)
+
+    def _render(self):
+        self._clamp_offset()
+        if self._frame is None:
+            window = []
+        else:
+            first = self._offset
+            if self._load_page is not None:
+                first -= self._page_start
+                page_end = self._page_start + len(self._frame)
+                if first < 0 or (first + self._visible > len(self._frame) and page_end < self._total):
+                    self._request_page()
+            window_frame = self._frame.iloc[max(0, first):max(0, first + self._visible)]
+            keys = window_frame.index if self.key_column is None else window_frame[self.key_column]
+            window = list(zip(
+                (str(key) for key in keys),
+                window_frame[self.columns].itertuples(index=False, name=None)
+            ))
+
+        # Drop items that scrolled out or no longer exist
+        wanted = {iid for iid, _ in window}
+        stale = [iid for iid in self._rendered if iid not in wanted]
+        if stale:
+            self.tree.delete(*stale)
+            for iid in stale:
+                del self._rendered[iid]
+
+        # Insert new items, update changed ones and fix ordering
+        children = self.tree.get_children()
+        for position, (iid, values) in enumerate(window):
+            shown = self._rendered.get(iid)
+            if shown is None:
+                self.tree.insert("", position, iid=iid, values=values)
+                children = None
+            else:
+                if shown != values:
+                    self.tree.item(iid, values=values)
+                if children is None:
+                    children = self.tree.get_children()
+                if children[position] != iid:
+                    self.tree.move(iid, "", position)
+                    children = None
+            self._rendered[iid] = values
+
+        self._update_scrollbar()
+
+    # Ask for the page at the current offset, once per offset
+    def _request_page(self):
+        if self._requested != self._offset:
+            self._requested = self._offset
+            self._load_page(self._offset)
+
+    def _update_scrollbar(self):
+        total = self.row_count()
+        if total:
+            first = self._offset / total
+            last = min(1.0, (self._offset + self._visible) / total)
+            self.status_label.config(
+                text=f"Showing {self._offset + 1}-{self._offset + len(self._rendered)} of {total}")
+        else:
+            first, last = 0.0, 1.0
+            self.status_label.config(text="No applications")
+        self.scrollbar.set(first, last)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self._offset = int(float(amount) * self.row_count())
+            self._render()
+        elif action == "scroll":
+            step = self._visible if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def _on_mousewheel(self, event):
+        self.scroll(-3 if event.delta > 0 else 3)
+        return "break"
+
+    # Keep the keyboard cursor moving past the edge of the rendered window
+    def _on_arrow_up(self, event):
+        children = self.tree.get_children()
+        if children and self.tree.focus() == children[0] and self._offset > 0:
+            self.scroll(-1)
+
+    def _on_arrow_down(self, event):
+        children = self.tree.get_children()
+        if children and self.tree.focus() == children[-1] and \
+                self._offset + self._visible < self.row_count():
+            self.scroll(1)
+
+    # Fit the window to the widget's height
+    def _on_resize(self, event):
+        style = ttk.Style()
+        try:
+            row_height = int(style.lookup("Treeview", "rowheight") or DEFAULT_ROW_HEIGHT)
+        except (TypeError, ValueError):
+            row_height = DEFAULT_ROW_HEIGHT
+        visible = max(1, (event.height - HEADING_HEIGHT) // row_height)
+        if visible != self._visible:
+            self._visible = visible
+            self._render()
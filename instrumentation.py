@@ -0,0 +1,131 @@
+import bisect
+import contextlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# Set JOB_TRACKER_PROFILE=1 to record timings from startup
+PROFILE_ENV = "JOB_TRACKER_PROFILE"
+
+# Every sample is written as one JSON line to a size-capped rotating log
+LOG_FILE = "job_tracker_perf.log"
+LOG_MAX_BYTES = 1024 * 1024
+LOG_BACKUP_COUNT = 3
+
+# Upper bounds of the latency histogram buckets; slower samples go in a last bucket
+BUCKET_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000)
+
+# Percentiles are taken over this many most recent samples per operation
+RECENT_SAMPLES = 500
+
+logger = logging.getLogger("job_tracker.perf")
+logger.propagate = False
+
+_lock = threading.Lock()
+_operations = {}
+_handler = None
+enabled = False
+
+
+# Linear-interpolated percentile of sorted values (same as numpy's default)
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (position - low)
+
+
+# Counts, a latency histogram and the recent samples of one operation
+class OperationStats:
+    def __init__(self):
+        self.count = 0
+        self.histogram = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+        self.last_rows = None
+
+    def add(self, milliseconds, rows):
+        self.count += 1
+        self.histogram[bisect.bisect_left(BUCKET_BOUNDS_MS, milliseconds)] += 1
+        self.recent.append(milliseconds)
+        if rows is not None:
+            self.last_rows = rows
+
+    def summary(self):
+        recent = sorted(self.recent)
+        p50, p95 = percentile(recent, 50), percentile(recent, 95)
+        labels = [f"<={bound}ms" for bound in BUCKET_BOUNDS_MS] + [f">{BUCKET_BOUNDS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "last_rows": self.last_rows,
+            "histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+# Start recording; samples are appended to log_path
+def enable(log_path=LOG_FILE):
+    global enabled, _handler
+    with _lock:
+        if _handler is None:
+            _handler = RotatingFileHandler(log_path, maxBytes=LOG_MAX_BYTES,
+                                           backupCount=LOG_BACKUP_COUNT, encoding="utf-8")
+            logger.addHandler(_handler)
+            logger.setLevel(logging.INFO)
+        enabled = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+# Record one sample of an operation taking `milliseconds` over `rows` rows
+def record(operation, milliseconds, rows=None):
+    if not enabled:
+        return
+    with _lock:
+        _operations.setdefault(operation, OperationStats()).add(milliseconds, rows)
+    logger.info(json.dumps({"time": round(time.time(), 3), "operation": operation,
+                            "ms": round(milliseconds, 3), "rows": rows}))
+
+
+# Row count attached to a sample once the timed block knows it
+class Sample:
+    def __init__(self, rows=None):
+        self.rows = rows
+
+
+# Time a block and record it under operation:
+#     with timed("filter") as sample:
+#         result = ...
+#         sample.rows = len(result)
+@contextlib.contextmanager
+def timed(operation, rows=None):
+    sample = Sample(rows)
+    start = time.perf_counter()
+    yield sample
+    if enabled:
+        record(operation, (time.perf_counter() - start) * 1000, sample.rows)
+
+
+# {operation: summary} for every operation recorded so far
+def snapshot():
+    with _lock:
+        return {operation: stats.summary() for operation, stats in sorted(_operations.items())}
+
+
+# Write the histograms of every operation to the log, e.g. at exit
+def log_summary():
+    if enabled and _operations:
+        logger.info(json.dumps({"time": round(time.time(), 3), "summary": snapshot()}))
+
+
+if os.environ.get(PROFILE_ENV, "") not in ("", "0"):
+    enable()
@@ -0,0 +1,1284 @@
+import contextlib
+import csv
+import functools
+import json
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+import columnar_cache
+from credential_store import STORAGE_BACKENDS, open_credential_store
+from file_lock import LOCK_SUFFIX, FileLock
+from instrumentation import timed
+from search_index import ApplicationQuery, TrigramIndex
+from stats_cache import StatusStatistics
+
+# Columns of the applications CSV, in file order
+APPLICATION_COLUMNS = ["User Name", "Company", "Position", "Date Applied", "Status"]
+
+# Statuses an application can have, in pipeline order
+APPLICATION_STATUSES = ["Applied", "Interview", "Rejected", "Hired"]
+
+# Date Applied format, the one the add form fills in and import accepts
+DATE_FORMAT = "%Y-%m-%d"
+
+# Stable per-application identifier, stored as the last CSV column
+ID_COLUMN = "Application ID"
+STORED_COLUMNS = APPLICATION_COLUMNS + [ID_COLUMN]
+
+# Changes since the last checkpoint are appended to <csv><JOURNAL_SUFFIX>;
+# every process coordinates through an advisory lock on <csv><LOCK_SUFFIX>
+JOURNAL_SUFFIX = ".journal"
+
+# Every add, status change and delete is also recorded, with an increasing
+# sequence number, in <csv><CHANGES_SUFFIX>. Unlike the journal it is never
+# emptied, so exports can be limited to the changes since a known sequence.
+CHANGES_SUFFIX = ".changes"
+
+# Fold the journal into the CSV once it holds this many entries, or once
+# deleted rows make up this share of the table
+CHECKPOINT_JOURNAL_ENTRIES = 5000
+CHECKPOINT_DELETE_RATIO = 0.2
+CHECKPOINT_MIN_DELETES = 20
+
+# Text columns that get a per-user substring index
+INDEXED_TEXT_COLUMNS = ("Company",)
+
+# Low-cardinality columns held as categoricals: one copy of each distinct
+# string plus small integer codes, so filters compare integers
+CATEGORICAL_COLUMNS = ("User Name", "Position", "Status")
+
+# Appended rows are folded into the main DataFrame once this many pile up
+PENDING_ROWS_LIMIT = 1024
+
+# Low-memory streaming reads the CSV this many rows at a time at first;
+# later chunks are sized from the first one so that a chunk takes at most
+# STREAM_CHUNK_SHARE of the memory limit. Parsing a chunk briefly needs
+# several times its final size, hence the small share.
+STREAM_FIRST_CHUNK_ROWS = 2000
+STREAM_MIN_CHUNK_ROWS = 500
+STREAM_CHUNK_SHARE = 0.1
+
+# Rows of the Application ID column checked at a time by initialize()
+# (STREAM_FIRST_CHUNK_ROWS in low-memory mode)
+ID_SCAN_CHUNK_ROWS = 50000
+
+_NO_POSITIONS = np.array([], dtype=np.intp)
+_NO_DATES = np.array([], dtype="datetime64[ns]")
+
+logger = logging.getLogger(__name__)
+
+
+# Serialize a store method on the store's lock; the UI thread and the
+# background workers share one store
+def synchronized(method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+# Random, stable identifier for a new application row
+def new_application_id():
+    return uuid.uuid4().hex
+
+
+# Read the applications CSV as plain text columns
+def read_applications_csv(path):
+    try:
+        df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    except FileNotFoundError:
+        df = pd.DataFrame(columns=APPLICATION_COLUMNS, dtype=str)
+    return df.reset_index(drop=True)
+
+
+# Replace a file in one step: write a temp file, fsync, then rename over
+def write_csv_atomically(frame, path):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", newline="", encoding="utf-8") as f:
+        frame.to_csv(f, index=False)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+# Append entries to a JSON-lines journal and fsync. A line left incomplete
+# by a crash is terminated first so it cannot swallow the new entries.
+# Returns the journal's new size in bytes.
+def append_journal(path, entries):
+    with open(path, "ab") as f:
+        if f.tell():
+            with open(path, "rb") as existing:
+                existing.seek(-1, os.SEEK_END)
+                if existing.read(1) != b"\n":
+                    f.write(b"\n")
+        f.write("".join(json.dumps(entry) + "\n" for entry in entries).encode("utf-8"))
+        f.flush()
+        os.fsync(f.fileno())
+        return f.tell()
+
+
+# Complete journal entries after byte offset; returns (entries, new offset)
+def read_journal(path, offset=0):
+    try:
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except FileNotFoundError:
+        return [], 0
+
+    end = data.rfind(b"\n") + 1
+    entries = []
+    for line in data[:end].splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            logger.warning("%s: skipping unreadable journal entry", path)
+    return entries, offset + end
+
+
+# Sequence number of the last complete entry of a change log, or 0
+def last_change_sequence(path):
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END)
+            block = 4096
+            while True:
+                f.seek(max(0, size - block))
+                lines = f.read(block).splitlines()
+                # The first line is cut off unless the block reaches the file start
+                candidates = lines if block >= size else lines[1:]
+                for line in reversed(candidates):
+                    try:
+                        return json.loads(line)["seq"]
+                    except (ValueError, KeyError):
+                        continue
+                if block >= size:
+                    return 0
+                block *= 4
+    except FileNotFoundError:
+        return 0
+
+
+# Entries of a change log with a sequence number above since, oldest first.
+# Sequence numbers grow through the file, so the first wanted entry is found
+# by bisecting byte offsets and only the entries after it are read.
+def read_changes(path, since=0):
+    try:
+        f = open(path, "rb")
+    except FileNotFoundError:
+        return []
+    with f:
+        size = f.seek(0, os.SEEK_END)
+
+        # Sequence of the first complete line starting at or after offset
+        def sequence_from(offset):
+            f.seek(max(0, offset - 1))
+            if offset:
+                f.readline()
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                return None
+            try:
+                return json.loads(line)["seq"]
+            except (ValueError, KeyError):
+                return since
+
+        # Smallest offset whose next line is past since (or the end of the file)
+        low, high = 0, size
+        while low < high:
+            middle = (low + high) // 2
+            sequence = sequence_from(middle)
+            if sequence is None or sequence > since:
+                high = middle
+            else:
+                low = middle + 1
+        entries, _ = read_journal(path, low if low == 0 else _line_start(f, low))
+    return [entry for entry in entries if entry.get("seq", 0) > since]
+
+
+def _line_start(f, offset):
+    f.seek(offset - 1)
+    f.readline()
+    return f.tell()
+
+
+# Parse Date Applied strings; unparseable values become NaT instead of raising.
+# Values are read as DATE_FORMAT; only the rest (legacy rows in other
+# formats) are parsed one by one, so pandas never guesses a single format
+# for the column and warns about it on every load.
+def parse_dates(values):
+    values = pd.Series(values, dtype=object)
+    dates = pd.to_datetime(values, format=DATE_FORMAT, errors="coerce")
+    legacy = dates.isna() & (values.fillna("").astype(str).str.strip() != "")
+    if legacy.any():
+        dates[legacy] = pd.to_datetime(values[legacy], format="mixed", errors="coerce")
+    return dates.to_numpy(dtype="datetime64[ns]")
+
+
+# Rows per streamed chunk so one chunk stays within its share of memory_limit bytes
+def stream_chunk_rows(chunk, memory_limit):
+    row_bytes = max(1, int(chunk.memory_usage(index=False, deep=True).sum()) // max(1, len(chunk)))
+    return max(STREAM_MIN_CHUNK_ROWS, int(memory_limit * STREAM_CHUNK_SHARE) // row_bytes)
+
+
+# Journal entries folded for streaming: (added rows by ID, deleted IDs,
+# {ID: latest status}), with adds limited to one user unless username is
+# None. IDs are never reused, so order does not matter.
+def _journal_changes(entries, username=None):
+    added, deleted, statuses = {}, set(), {}
+    for entry in entries:
+        if entry.get("op") == "add" and username in (None, entry["row"][0]):
+            added.setdefault(entry["row"][-1], list(entry["row"]))
+        elif entry.get("op") == "delete":
+            deleted.add(entry["id"])
+        elif entry.get("op") == "status":
+            statuses[entry["id"]] = entry["status"]
+    return added, deleted, statuses
+
+
+# Rows of text columns with folded journal deletes and status changes applied
+def _apply_journal_changes(rows, deleted, statuses):
+    if deleted:
+        rows = rows[~rows[ID_COLUMN].isin(deleted)]
+    if statuses:
+        rows = rows.assign(Status=rows[ID_COLUMN].map(statuses).fillna(rows["Status"]))
+    return rows
+
+
+# The applications CSV with its journal applied, as plain text columns,
+# without writing anything next to it: rows without an Application ID get
+# one in memory only, and the lock is taken only if the file already exists
+def read_applications_snapshot(path):
+    lock_path = path + LOCK_SUFFIX
+    with FileLock(lock_path).shared() if os.path.exists(lock_path) else contextlib.nullcontext():
+        rows = read_applications_csv(path)
+        entries, _ = read_journal(path + JOURNAL_SUFFIX)
+    if ID_COLUMN not in rows.columns:
+        rows[ID_COLUMN] = ""
+    missing = rows[ID_COLUMN] == ""
+    rows.loc[missing, ID_COLUMN] = [new_application_id() for _ in range(int(missing.sum()))]
+
+    added, deleted, statuses = _journal_changes(entries)
+    # An add replayed after a crash may already be in the CSV
+    for application_id in rows[ID_COLUMN].tolist() if added else ():
+        added.pop(application_id, None)
+    rows = rows[STORED_COLUMNS]
+    if added:
+        rows = pd.concat([rows, pd.DataFrame(list(added.values()), columns=STORED_COLUMNS, dtype=str)],
+                         ignore_index=True)
+    return _apply_journal_changes(rows, deleted, statuses).reset_index(drop=True)
+
+
+# Complete entries in a journal, counted without parsing them
+def journal_entry_count(path):
+    try:
+        with open(path, "rb") as f:
+            return sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 16), b""))
+    except FileNotFoundError:
+        return 0
+
+
+# Normalized (Company, Position, Date Applied) of an application, the key
+# duplicates are found by within a user's applications. Surrounding spaces
+# are dropped and case is folded, so "Acme Corp " and "acme corp" match.
+def application_key(company, position, date_applied):
+    return (str(company).strip().casefold(), str(position).strip().casefold(), str(date_applied).strip())
+
+
+# One DataFrame from a stream of chunks, e.g. a user's streamed rows
+def collect_chunks(chunks):
+    frames = list(chunks)
+    if not frames:
+        return pd.DataFrame(columns=STORED_COLUMNS, dtype=str)
+    return pd.concat(frames, ignore_index=True)
+
+
+# (rows in the whole stream, DataFrame of rows start to start + count) from
+# a stream of chunks; only the page's rows are kept as the rest stream past
+def page_of_chunks(chunks, start, count):
+    total = 0
+    parts = []
+    for chunk in chunks:
+        if total < start + count and total + len(chunk) > start:
+            parts.append(chunk.iloc[max(0, start - total):start + count - total])
+        total += len(chunk)
+    return total, collect_chunks(parts)
+
+
+# The rows of each chunk (text columns) that match an ApplicationQuery, by
+# the same rules as ApplicationStore.search
+def filter_chunks(chunks, query):
+    for rows in chunks:
+        keep = np.ones(len(rows), dtype=bool)
+        for column, text in (("Company", query.company), ("Position", query.position)):
+            if text:
+                keep &= rows[column].str.lower().str.contains(text, regex=False).to_numpy(dtype=bool)
+        if query.status:
+            keep &= (rows["Status"] == query.status).to_numpy(dtype=bool)
+        if query.date_from is not None or query.date_to is not None:
+            dates = parse_dates(rows["Date Applied"])
+            keep &= ~np.isnat(dates)
+            if query.date_from is not None:
+                keep &= dates >= query.date_from
+            if query.date_to is not None:
+                keep &= dates <= query.date_to
+        if keep.any():
+            yield rows[keep]
+
+
+# In-memory copy of the applications CSV with a per-user row index.
+# The file is parsed once and only re-read when its mtime or size changes,
+# so a per-user query costs O(that user's rows) instead of O(file).
+# Every row carries a stable Application ID. Adds and deletes from any
+# process are appended to a write-ahead journal under an advisory file lock;
+# other processes replay just the new journal entries. A checkpoint folds
+# the journal into the CSV with an atomic rename.
+# With memory_limit (bytes) set, the store runs in low-memory mode: history,
+# search, statistics, duplicate checks, adds, deletes, status changes and
+# checkpoints stream the CSV in chunks instead of loading the table. df,
+# users() and user_positions() still load it.
+class ApplicationStore:
+    def __init__(self, path, memory_limit=None):
+        self.path = path
+        self.memory_limit = memory_limit
+        self.journal_path = path + JOURNAL_SUFFIX
+        self.changes_path = path + CHANGES_SUFFIX
+        self._file_lock = FileLock(path + LOCK_SUFFIX)
+        self._lock = threading.RLock()
+        self._base = pd.DataFrame(columns=STORED_COLUMNS, dtype=str)
+        # Rows appended since the last load, not yet folded into _base
+        self._pending = []
+        # Date Applied parsed once, aligned with _base / _pending
+        self._dates = _NO_DATES
+        self._pending_dates = []
+        self._user_index = {}
+        # Application ID -> position of its live row
+        self._id_positions = {}
+        # Positions deleted since the last load
+        self._deleted = set()
+        # Journal bytes already applied, and entries/deletes since the last checkpoint
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._journal_deletes = 0
+        self._checkpointing = False
+        # username -> {column: TrigramIndex over that user's rows}, built on first search
+        self._text_indexes = {}
+        # username -> (sorted dates, positions in that order, count of valid dates)
+        self._date_indexes = {}
+        # username -> StatusStatistics, built on first use
+        self._statistics = {}
+        # username -> (ApplicationQuery, matching positions) of the last search
+        self._last_queries = {}
+        # username -> {application_key: positions of that user's rows with it}, built on first use
+        self._duplicate_indexes = {}
+        # Positions whose Date Applied could not be parsed at load time
+        self.invalid_date_positions = _NO_POSITIONS
+        # Application IDs of the rows last warned about, so reloads and
+        # checkpoints do not repeat the same warning
+        self._reported_invalid_dates = frozenset()
+        # What has already been reported as over memory_limit
+        self._over_limit = set()
+        self._signature = None
+        self._loaded = False
+
+    # mtime + size identify a version of the CSV without reading it
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _journal_size(self):
+        try:
+            return os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return 0
+
+    # Give rows written before IDs existed (or by hand) an Application ID
+    def _assign_missing_ids(self, base):
+        if ID_COLUMN not in base.columns:
+            base[ID_COLUMN] = ""
+        missing = base[ID_COLUMN] == ""
+        base.loc[missing, ID_COLUMN] = [new_application_id() for _ in range(int(missing.sum()))]
+        base = base[STORED_COLUMNS]
+        write_csv_atomically(base, self.path)
+        logger.info("%s: assigned Application IDs to %d rows", self.path, int(missing.sum()))
+        return base
+
+    # The CSV's rows and parsed dates, from the columnar cache when it is
+    # still current; otherwise the CSV is parsed and the cache rebuilt
+    def _read_table(self):
+        cached = columnar_cache.read_cache(self.path)
+        if cached is not None:
+            base, dates = cached
+            # A no-op for caches written with categoricals
+            base = base.astype({col: "category" for col in CATEGORICAL_COLUMNS})
+            # An empty table comes back with object categories; appended rows
+            # bring text ones, and union_categoricals needs them to match
+            for col in CATEGORICAL_COLUMNS:
+                if base[col].cat.categories.dtype == object:
+                    base[col] = base[col].astype(str).astype("category")
+            return base, dates
+
+        if not os.path.exists(self.path):
+            # Reading never creates the file; initialize() and writes do
+            base = pd.DataFrame(columns=STORED_COLUMNS, dtype=str)
+            return base.astype({col: "category" for col in CATEGORICAL_COLUMNS}), _NO_DATES
+
+        base = read_applications_csv(self.path)
+        if ID_COLUMN not in base.columns or (base[ID_COLUMN] == "").any():
+            base = self._assign_missing_ids(base)
+        base = base[STORED_COLUMNS].astype({col: "category" for col in CATEGORICAL_COLUMNS})
+        dates = parse_dates(base["Date Applied"])
+        self._write_cache(base, dates)
+        return base, dates
+
+    # The cache only speeds up loads, so failing to write it is not an error
+    def _write_cache(self, frame, dates):
+        try:
+            columnar_cache.write_cache(self.path, frame, dates)
+        except OSError as e:
+            logger.warning("%s: could not write the columnar cache (%s)", self.path, e)
+
+    # Read the CSV and replay the whole journal; needs the exclusive file lock
+    def _load(self):
+        self._base, self._dates = self._read_table()
+        self._check_memory("the whole table", self._base)
+        self._id_positions = dict(zip(self._base[ID_COLUMN].tolist(), range(len(self._base))))
+        self._deleted = set()
+        self._pending = []
+        self._pending_dates = []
+        self._user_index = dict(self._base.groupby("User Name", sort=False, observed=True).indices)
+        self._text_indexes = {}
+        self._date_indexes = {}
+        self._statistics = {}
+        self._last_queries = {}
+        self._duplicate_indexes = {}
+        self._signature = self._file_signature()
+
+        # Report bad dates here instead of failing later in a search, once
+        # per distinct set of bad rows
+        self.invalid_date_positions = np.flatnonzero(np.isnat(self._dates))
+        invalid_ids = frozenset(self._base[ID_COLUMN].take(self.invalid_date_positions))
+        if invalid_ids and invalid_ids != self._reported_invalid_dates:
+            logger.warning("%s: %d rows have an unreadable Date Applied and are left out of date filters",
+                           self.path, len(self.invalid_date_positions))
+        self._reported_invalid_dates = invalid_ids
+
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._journal_deletes = 0
+        self._loaded = True
+        self._replay_journal()
+
+    # Apply journal entries written since the last replay
+    def _replay_journal(self):
+        entries, self._journal_offset = read_journal(self.journal_path, self._journal_offset)
+        added = []
+        for entry in entries:
+            if entry.get("op") == "add":
+                added.append(entry["row"])
+                continue
+            if added:
+                self._apply_adds(added)
+                added = []
+            if entry.get("op") == "delete":
+                self._apply_delete(entry["id"])
+            elif entry.get("op") == "status":
+                self._apply_status(entry["id"], entry["status"])
+        if added:
+            self._apply_adds(added)
+        self._journal_entries += len(entries)
+
+    # Create the CSV with just a header if it does not exist yet, and give
+    # rows written before IDs existed (or by hand) an Application ID, so
+    # streamed reads never meet a row without one
+    @synchronized
+    def initialize(self):
+        with self._file_lock.exclusive():
+            if not os.path.exists(self.path):
+                write_csv_atomically(pd.DataFrame(columns=STORED_COLUMNS), self.path)
+                self.invalidate()
+            elif self._ids_missing():
+                self._assign_missing_ids_streaming()
+                self.invalidate()
+
+    # Whether the CSV lacks the Application ID column or has rows with an
+    # empty one; reads only that column, a chunk at a time
+    def _ids_missing(self):
+        with open(self.path, newline="", encoding="utf-8") as f:
+            header = next(csv.reader([f.readline()]), None)
+        if not header:
+            return False
+        if ID_COLUMN not in header:
+            return True
+        chunk_rows = ID_SCAN_CHUNK_ROWS if self.memory_limit is None else STREAM_FIRST_CHUNK_ROWS
+        with pd.read_csv(self.path, usecols=[ID_COLUMN], dtype=str, keep_default_na=False,
+                         chunksize=chunk_rows) as reader:
+            return any((chunk[ID_COLUMN] == "").any() for chunk in reader)
+
+    # Rewrite the CSV without loading it: each chunk of text columns goes
+    # through transform(chunk), then the rows of tail() (a DataFrame, or None)
+    # are appended; written to a temp file and renamed over. Needs the
+    # exclusive file lock.
+    def _rewrite_in_chunks(self, transform, tail=lambda: None):
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w", newline="", encoding="utf-8") as f:
+            pd.DataFrame(columns=STORED_COLUMNS).to_csv(f, index=False)
+            with pd.read_csv(self.path, dtype=str, keep_default_na=False,
+                             chunksize=STREAM_FIRST_CHUNK_ROWS) as reader:
+                for chunk in reader:
+                    transform(chunk)[STORED_COLUMNS].to_csv(f, index=False, header=False)
+            rows = tail()
+            if rows is not None and len(rows):
+                rows[STORED_COLUMNS].to_csv(f, index=False, header=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    # _assign_missing_ids without loading the table; needs the exclusive file lock
+    def _assign_missing_ids_streaming(self):
+        assigned = 0
+
+        def assign(chunk):
+            nonlocal assigned
+            if ID_COLUMN not in chunk.columns:
+                chunk[ID_COLUMN] = ""
+            missing = chunk[ID_COLUMN] == ""
+            chunk.loc[missing, ID_COLUMN] = [new_application_id() for _ in range(int(missing.sum()))]
+            assigned += int(missing.sum())
+            return chunk
+
+        self._rewrite_in_chunks(assign)
+        logger.info("%s: assigned Application IDs to %d rows", self.path, assigned)
+
+    # Log once per kind of data when holding frame goes over memory_limit;
+    # the limit sizes the streamed chunks but cannot stop a caller from
+    # keeping more rows than it allows
+    def _check_memory(self, what, frame):
+        if self.memory_limit is None or what in self._over_limit:
+            return
+        size = int(frame.memory_usage(index=False, deep=True).sum())
+        if size > self.memory_limit:
+            self._over_limit.add(what)
+            logger.warning("%s: %s took %.1f MB, over the %.1f MB memory limit",
+                           self.path, what, size / (1024 * 1024), self.memory_limit / (1024 * 1024))
+
+    # One DataFrame from streamed chunks, reported if it is over memory_limit
+    def _collected(self, chunks, what):
+        rows = collect_chunks(chunks)
+        self._check_memory(what, rows)
+        return rows
+
+    # Catch up with changes made by this or any other process. New journal
+    # entries are replayed under a shared lock; a rewritten CSV is reloaded.
+    @synchronized
+    def refresh(self):
+        if self._loaded and self._file_signature() == self._signature:
+            if self._journal_size() == self._journal_offset:
+                return
+            with self._file_lock.shared():
+                # A checkpoint may have rewritten the CSV before the lock was granted
+                if self._file_signature() == self._signature:
+                    self._replay_journal()
+                    return
+        with self._file_lock.exclusive():
+            if self._loaded and self._file_signature() == self._signature:
+                self._replay_journal()
+            else:
+                with timed("csv_load") as sample:
+                    self._load()
+                    sample.rows = len(self._base)
+
+    # Force a reload on the next access
+    @synchronized
+    def invalidate(self):
+        self._loaded = False
+
+    # Fold pending appended rows into the main DataFrame
+    def _consolidate(self):
+        if self._pending:
+            pending = pd.DataFrame(self._pending, columns=STORED_COLUMNS, dtype=str)
+            columns = {}
+            for col in STORED_COLUMNS:
+                if col in CATEGORICAL_COLUMNS:
+                    # Merge the categories instead of falling back to strings
+                    columns[col] = union_categoricals([self._base[col], pending[col].astype("category")],
+                                                      ignore_order=True)
+                else:
+                    columns[col] = pd.concat([self._base[col], pending[col]], ignore_index=True)
+            self._base = pd.DataFrame(columns)
+            self._dates = np.concatenate([self._dates, np.array(self._pending_dates, dtype="datetime64[ns]")])
+            self._pending = []
+            self._pending_dates = []
+
+    # The whole table, including rows appended and minus rows deleted since the last load
+    @property
+    @synchronized
+    def df(self):
+        self.refresh()
+        self._consolidate()
+        if self._deleted:
+            return self._base.drop(index=sorted(self._deleted))
+        return self._base
+
+    # Row positions of a user's applications, in file order
+    @synchronized
+    def user_positions(self, username):
+        self.refresh()
+        return self._user_index.get(username, _NO_POSITIONS)
+
+    # A user's applications as a DataFrame, in file order
+    @synchronized
+    def user_rows(self, username):
+        if self.memory_limit is not None:
+            return self._collected(self.iter_user_chunks(username, self.memory_limit), "one user's rows")
+        return self._rows_at(self.user_positions(username))
+
+    # Rows at ascending positions, including ones still pending
+    def _rows_at(self, positions):
+        base_count = len(self._base)
+        if not len(positions) or positions[-1] < base_count:
+            return self._base.take(positions)
+
+        # Some of the user's rows are still pending; build just those
+        split = np.searchsorted(positions, base_count)
+        pending = pd.DataFrame([self._pending[p - base_count] for p in positions[split:]],
+                               columns=STORED_COLUMNS, index=positions[split:], dtype=str)
+        return pd.concat([self._base.take(positions[:split]), pending])
+
+    # Parsed Date Applied values at ascending positions
+    def _dates_at(self, positions):
+        base_count = len(self._base)
+        if not len(positions) or positions[-1] < base_count:
+            return self._dates[positions]
+        split = np.searchsorted(positions, base_count)
+        pending = np.array([self._pending_dates[p - base_count] for p in positions[split:]],
+                           dtype="datetime64[ns]")
+        return np.concatenate([self._dates[positions[:split]], pending])
+
+    # A user's parsed Date Applied values, aligned with user_rows()
+    @synchronized
+    def user_dates(self, username):
+        positions = self.user_positions(username)
+        return pd.Series(self._dates_at(positions), index=positions, name="Date Applied")
+
+    # Rows of a user whose Date Applied could not be parsed
+    @synchronized
+    def invalid_dates(self, username):
+        if self.memory_limit is not None:
+            return self._collected((rows[np.isnat(parse_dates(rows["Date Applied"]))]
+                                    for rows in self.iter_user_chunks(username, self.memory_limit)),
+                                   "rows with unreadable dates")
+        positions = self.user_positions(username)
+        return self._rows_at(positions[np.isnat(self._dates_at(positions))])
+
+    # A user's applications streamed from the CSV as DataFrames of text
+    # columns, without loading the table: each chunk of the file is read,
+    # filtered down to the user's rows and dropped, so memory stays around
+    # one chunk (sized from memory_limit bytes) plus the rows kept by the
+    # caller. Journal changes not yet checkpointed are applied.
+    def iter_user_chunks(self, username, memory_limit):
+        # The CSV is only ever replaced by a rename, so a file opened under
+        # the lock stays consistent with the journal read alongside it
+        with self._file_lock.shared():
+            try:
+                csv_file = open(self.path, newline="", encoding="utf-8")
+            except FileNotFoundError:
+                csv_file = None
+            entries, _ = read_journal(self.journal_path)
+        added, deleted, statuses = _journal_changes(entries, username)
+
+        if csv_file is not None:
+            with csv_file:
+                header = next(csv.reader([csv_file.readline()]), None)
+                if header and ID_COLUMN not in header:
+                    raise ValueError(f"{self.path} has no {ID_COLUMN} column yet; "
+                                     f"initialize() the store to assign IDs")
+                if header:
+                    with pd.read_csv(csv_file, header=None, names=header, dtype=str, keep_default_na=False,
+                                     iterator=True) as reader:
+                        chunk_rows = STREAM_FIRST_CHUNK_ROWS
+                        while True:
+                            try:
+                                chunk = reader.get_chunk(chunk_rows)
+                            except StopIteration:
+                                break
+                            chunk_rows = stream_chunk_rows(chunk, memory_limit)
+                            self._check_memory("a streamed chunk", chunk)
+                            rows = chunk.loc[chunk["User Name"] == username, STORED_COLUMNS]
+                            del chunk
+                            if not len(rows):
+                                continue
+                            if (rows[ID_COLUMN] == "").any():
+                                raise ValueError(f"{self.path} has rows without an {ID_COLUMN}; "
+                                                 f"initialize() the store to assign IDs")
+                            # An add replayed after a crash may already be in the CSV
+                            for application_id in rows[ID_COLUMN].tolist() if added else ():
+                                added.pop(application_id, None)
+                            rows = _apply_journal_changes(rows, deleted, statuses)
+                            if len(rows):
+                                yield rows
+
+        if added:
+            yield _apply_journal_changes(pd.DataFrame(list(added.values()), columns=STORED_COLUMNS, dtype=str),
+                                         deleted, statuses)
+
+    # Snapshot of a user's weekly and total status counts. The cached
+    # counts are maintained incrementally, so this costs O(weeks).
+    @synchronized
+    def statistics(self, username):
+        if self.memory_limit is not None:
+            statistics = StatusStatistics()
+            for rows in self.iter_user_chunks(username, self.memory_limit):
+                statistics.update(StatusStatistics.build(parse_dates(rows["Date Applied"]), rows["Status"].to_numpy()))
+            return statistics
+        if username not in self._statistics:
+            positions = self.user_positions(username)
+            self._statistics[username] = StatusStatistics.build(
+                self._dates_at(positions), self._rows_at(positions)["Status"].array)
+        return self._statistics[username].copy()
+
+    @synchronized
+    def users(self):
+        self.refresh()
+        return list(self._user_index)
+
+    # application_key of the row at a position, including pending rows
+    def _key_at(self, position):
+        return application_key(*(self._value_at(position, col) for col in ("Company", "Position", "Date Applied")))
+
+    # Hash index from application key to a user's row positions; one pass
+    # over the user's rows, then kept current by adds and deletes
+    def _duplicate_index(self, username):
+        if username not in self._duplicate_indexes:
+            positions = self._user_index.get(username, _NO_POSITIONS)
+            rows = self._rows_at(positions)
+            index = {}
+            for position, values in zip(positions.tolist(), zip(rows["Company"].tolist(), rows["Position"].tolist(),
+                                                                rows["Date Applied"].tolist())):
+                index.setdefault(application_key(*values), []).append(position)
+            self._duplicate_indexes[username] = index
+        return self._duplicate_indexes[username]
+
+    # Application IDs of the user's applications with the same key as
+    # record (a dict keyed by APPLICATION_COLUMNS), oldest first
+    @synchronized
+    def duplicates_of(self, record):
+        key = application_key(record["Company"], record["Position"], record["Date Applied"])
+        if self.memory_limit is not None:
+            return [application_id for application_id, keys in self._streamed_keys(str(record["User Name"]))
+                    if keys == key]
+        self.refresh()
+        positions = self._duplicate_index(str(record["User Name"])).get(key, [])
+        return [self._value_at(position, ID_COLUMN) for position in positions]
+
+    # (Application ID, application_key) of each of a user's applications,
+    # streamed from the CSV
+    def _streamed_keys(self, username):
+        for rows in self.iter_user_chunks(username, self.memory_limit):
+            for application_id, *values in zip(rows[ID_COLUMN].tolist(), rows["Company"].tolist(),
+                                               rows["Position"].tolist(), rows["Date Applied"].tolist()):
+                yield application_id, application_key(*values)
+
+    # Status of one of a user's applications streamed from the CSV, or None
+    # if the user has no such application
+    def _streamed_status(self, username, application_id):
+        for rows in self.iter_user_chunks(username, self.memory_limit):
+            found = rows.loc[rows[ID_COLUMN] == application_id, "Status"]
+            if len(found):
+                return found.iat[0]
+        return None
+
+    # Row value of one column for a position, including pending rows
+    def _value_at(self, position, column):
+        base_count = len(self._base)
+        if position < base_count:
+            return self._base[column].iat[position]
+        return self._pending[position - base_count][STORED_COLUMNS.index(column)]
+
+    # Substring index over one of a user's text columns, built on first use
+    def _text_index(self, username, column):
+        indexes = self._text_indexes.setdefault(username, {})
+        if column not in indexes:
+            positions = self.user_positions(username)
+            texts = self._rows_at(positions)[column]
+            indexes[column] = TrigramIndex.build(positions.tolist(), texts)
+        return indexes[column]
+
+    # A user's dates sorted once, so range filters are two binary searches
+    def _date_index(self, username):
+        if username not in self._date_indexes:
+            positions = self.user_positions(username)
+            dates = self._dates_at(positions)
+            order = np.argsort(dates, kind="stable")
+            sorted_dates = dates[order]
+            # NaT sorts last; keep those rows out of every range
+            valid_count = len(sorted_dates) - int(np.isnat(sorted_dates).sum())
+            self._date_indexes[username] = (sorted_dates, positions[order], valid_count)
+        return self._date_indexes[username]
+
+    # Slice [low, high) of the user's date index with date_from <= date <= date_to
+    # (datetime64 bounds or None)
+    def _date_range_bounds(self, username, date_from, date_to):
+        sorted_dates, positions, valid_count = self._date_index(username)
+        valid_dates = sorted_dates[:valid_count]
+        low, high = 0, valid_count
+        if date_from is not None:
+            low = np.searchsorted(valid_dates, date_from, side="left")
+        if date_to is not None:
+            high = np.searchsorted(valid_dates, date_to, side="right")
+        return low, max(low, high)
+
+    # Positions of a user's rows with date_from <= Date Applied <= date_to
+    def _positions_in_date_range(self, username, date_from, date_to):
+        low, high = self._date_range_bounds(username, date_from, date_to)
+        return np.sort(self._date_index(username)[1][low:high])
+
+    # Those of the given positions whose date is within the bounds; NaT never is
+    def _positions_between_dates(self, positions, date_from, date_to):
+        dates = self._dates_at(positions)
+        keep = ~np.isnat(dates)
+        if date_from is not None:
+            keep &= dates >= date_from
+        if date_to is not None:
+            keep &= dates <= date_to
+        return positions[keep]
+
+    # Codes of the categories of a categorical column that satisfy matches()
+    def _matching_codes(self, column, matches):
+        return np.flatnonzero([matches(str(category)) for category in self._base[column].array.categories])
+
+    # Those of the given positions whose categorical column satisfies
+    # matches(). The test runs once per category; rows are then kept by
+    # comparing integer codes.
+    def _positions_in_categories(self, positions, column, matches):
+        values = self._base[column].array
+        matching_codes = self._matching_codes(column, matches)
+
+        base_count = len(self._base)
+        split = np.searchsorted(positions, base_count)
+        base_positions = positions[:split]
+        kept = base_positions[np.isin(values.codes[base_positions], matching_codes)]
+
+        # Pending rows are still plain strings
+        column_index = STORED_COLUMNS.index(column)
+        pending = [p for p in positions[split:] if matches(self._pending[p - base_count][column_index])]
+        return np.concatenate([kept, np.array(pending, dtype=np.intp)])
+
+    # How many of the given positions could satisfy matches(), from code counts
+    def _category_estimate(self, positions, column, matches):
+        values = self._base[column].array
+        split = np.searchsorted(positions, len(self._base))
+        counts = np.bincount(values.codes[positions[:split]], minlength=len(values.categories))
+        return int(counts[self._matching_codes(column, matches)].sum()) + len(positions) - split
+
+    # One step per active filter: (estimated matches, select, narrow).
+    # select() finds the user's matching rows through an index; narrow()
+    # keeps the matching ones of an ascending array of candidate positions.
+    # Steps come most selective first.
+    def _query_plan(self, username, query):
+        user_positions = self.user_positions(username)
+        steps = []
+
+        # Company goes through the trigram index
+        if query.company:
+            index = self._text_index(username, "Company")
+
+            def select_company():
+                matches = index.search(query.company)
+                return np.sort(np.fromiter(matches, dtype=np.intp, count=len(matches)))
+
+            steps.append((index.estimate(query.company), select_company,
+                          lambda positions: np.array(index.filter(positions, query.company), dtype=np.intp)))
+
+        # Position and Status test a handful of categories, then compare codes
+        for column, text, matches in (
+                ("Position", query.position, lambda value: query.position in value.lower()),
+                ("Status", query.status, lambda value: value == query.status)):
+            if text:
+                steps.append((self._category_estimate(user_positions, column, matches),
+                               functools.partial(self._positions_in_categories, user_positions, column, matches),
+                               functools.partial(self._positions_in_categories, column=column, matches=matches)))
+
+        # Date bounds bisect the user's pre-sorted dates
+        if query.date_from is not None or query.date_to is not None:
+            low, high = self._date_range_bounds(username, query.date_from, query.date_to)
+            steps.append((high - low,
+                          functools.partial(self._positions_in_date_range, username, query.date_from, query.date_to),
+                          functools.partial(self._positions_between_dates, date_from=query.date_from,
+                                            date_to=query.date_to)))
+
+        return sorted(steps, key=lambda step: step[0])
+
+    # A user's applications filtered by Company/Position substrings, an exact
+    # Status and an inclusive Date Applied range; empty filters are ignored.
+    # The most selective filter picks the candidates from its index and the
+    # others only check those. A query that narrows the user's previous one
+    # (more text typed, a tighter date range) starts from its result.
+    @synchronized
+    def search(self, username, company="", date_from=None, date_to=None, position="", status=""):
+        query = ApplicationQuery(company, position, status, date_from, date_to)
+        if self.memory_limit is not None:
+            return self._collected(filter_chunks(self.iter_user_chunks(username, self.memory_limit), query),
+                                   "search results")
+        positions = self.user_positions(username)
+        if query.is_empty():
+            self._last_queries.pop(username, None)
+            return self._rows_at(positions)
+
+        steps = self._query_plan(username, query)
+        previous = self._last_queries.get(username)
+        if previous is not None and query.narrows(previous[0]):
+            positions = previous[1]
+        else:
+            positions = steps.pop(0)[1]()
+        for _, _, narrow in steps:
+            positions = narrow(positions)
+
+        self._last_queries[username] = (query, positions)
+        return self._rows_at(positions)
+
+    # Delete one of a user's applications by ID with a journal append.
+    # Returns the number of rows removed (0 or 1).
+    @synchronized
+    def delete(self, username, application_id):
+        with self._file_lock.exclusive():
+            if self.memory_limit is not None:
+                if self._streamed_status(username, application_id) is None:
+                    return 0
+                self._write_journal_streamed([{"op": "delete", "id": application_id}])
+            else:
+                self.refresh()
+                position = self._id_positions.get(application_id)
+                if position is None or self._value_at(position, "User Name") != username:
+                    return 0
+                self._write_journal([{"op": "delete", "id": application_id}])
+                self._apply_delete(application_id)
+            self._log_changes([{"op": "delete", "user": username, "id": application_id}])
+        self._start_checkpoint_if_due()
+        return 1
+
+    # Set the Status of one of a user's applications with a journal append.
+    # Returns the number of rows found (0 or 1).
+    @synchronized
+    def update_status(self, username, application_id, status):
+        with self._file_lock.exclusive():
+            if self.memory_limit is not None:
+                previous = self._streamed_status(username, application_id)
+                if previous is None:
+                    return 0
+            else:
+                self.refresh()
+                position = self._id_positions.get(application_id)
+                if position is None or self._value_at(position, "User Name") != username:
+                    return 0
+                previous = self._value_at(position, "Status")
+            if previous != status:
+                if self.memory_limit is not None:
+                    self._write_journal_streamed([{"op": "status", "id": application_id, "status": status}])
+                else:
+                    self._write_journal([{"op": "status", "id": application_id, "status": status}])
+                    self._apply_status(application_id, status)
+                self._log_changes([{"op": "status", "user": username, "id": application_id, "status": status}])
+        self._start_checkpoint_if_due()
+        return 1
+
+    def _apply_status(self, application_id, status):
+        position = self._id_positions.get(application_id)
+        if position is None:
+            return
+        username = self._value_at(position, "User Name")
+        previous = self._value_at(position, "Status")
+        base_count = len(self._base)
+        if position < base_count:
+            # A new column on a new frame, so earlier df/user_rows results keep their values
+            statuses = self._base["Status"].copy()
+            if status not in statuses.cat.categories:
+                statuses = statuses.cat.add_categories([status])
+            statuses.iat[position] = status
+            self._base = self._base.assign(Status=statuses)
+        else:
+            self._pending[position - base_count][STORED_COLUMNS.index("Status")] = status
+
+        self._last_queries.pop(username, None)
+        if username in self._statistics:
+            date = self._dates_at(np.array([position]))[0]
+            self._statistics[username].remove(date, previous)
+            self._statistics[username].add(date, status)
+
+    # Record changes in the change log under the next sequence numbers;
+    # the caller holds the exclusive lock
+    def _log_changes(self, changes):
+        sequence = last_change_sequence(self.changes_path)
+        changed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        append_journal(self.changes_path, [{"seq": sequence + number, "time": changed_at, **change}
+                                           for number, change in enumerate(changes, start=1)])
+
+    # (a user's changes with a sequence number above since, the latest
+    # sequence number of the whole log). Reads only the end of the log.
+    def changes_since(self, username, since=0):
+        with self._file_lock.shared():
+            changes = read_changes(self.changes_path, since)
+            latest = changes[-1]["seq"] if changes else since
+        return [change for change in changes if change.get("user") == username], latest
+
+    # (a user's applications, the latest change sequence number) as of the
+    # same moment, to start a series of delta exports from
+    @synchronized
+    def change_snapshot(self, username):
+        with self._file_lock.exclusive():
+            return self.user_rows(username), last_change_sequence(self.changes_path)
+
+    def _apply_delete(self, application_id):
+        position = self._id_positions.pop(application_id, None)
+        if position is None:
+            return
+        self._deleted.add(position)
+        self._journal_deletes += 1
+        self._forget_position(self._value_at(position, "User Name"), position)
+
+    # Append entries to the journal; the caller holds the exclusive lock and
+    # has replayed everything before them
+    def _write_journal(self, entries):
+        self._journal_offset = append_journal(self.journal_path, entries)
+        self._journal_entries += len(entries)
+
+    # Append entries to the journal in low-memory mode. Nothing is held in
+    # memory to update, and the replay offset is left alone so a table
+    # loaded anyway picks the entries up on its next refresh.
+    def _write_journal_streamed(self, entries):
+        append_journal(self.journal_path, entries)
+
+    # Drop a deleted row from the per-user index, search indexes and statistics
+    def _forget_position(self, username, position):
+        self._last_queries.pop(username, None)
+        positions = self._user_index[username]
+        remaining = positions[positions != position]
+        if len(remaining):
+            self._user_index[username] = remaining
+        else:
+            del self._user_index[username]
+
+        for index in self._text_indexes.get(username, {}).values():
+            index.remove(position)
+
+        if username in self._duplicate_indexes:
+            key = self._key_at(position)
+            same_key = [other for other in self._duplicate_indexes[username].get(key, []) if other != position]
+            if same_key:
+                self._duplicate_indexes[username][key] = same_key
+            else:
+                self._duplicate_indexes[username].pop(key, None)
+
+        date = self._dates_at(np.array([position]))[0]
+        if username in self._date_indexes:
+            sorted_dates, ordered_positions, valid_count = self._date_indexes[username]
+            keep = ordered_positions != position
+            if not np.isnat(date):
+                valid_count -= 1
+            self._date_indexes[username] = (sorted_dates[keep], ordered_positions[keep], valid_count)
+
+        if username in self._statistics:
+            self._statistics[username].remove(date, self._value_at(position, "Status"))
+
+    def _checkpoint_due(self):
+        # Low-memory mode cannot count live rows, so only the journal length counts
+        if self.memory_limit is not None:
+            return journal_entry_count(self.journal_path) >= CHECKPOINT_JOURNAL_ENTRIES
+        live_rows = len(self._id_positions)
+        return (self._journal_entries >= CHECKPOINT_JOURNAL_ENTRIES or
+                (self._journal_deletes >= CHECKPOINT_MIN_DELETES and
+                 self._journal_deletes >= CHECKPOINT_DELETE_RATIO * (live_rows + self._journal_deletes)))
+
+    def _start_checkpoint_if_due(self):
+        if not self._checkpointing and self._checkpoint_due():
+            self._checkpointing = True
+            threading.Thread(target=self.checkpoint, name="job-tracker-checkpoint", daemon=True).start()
+
+    # Fold the journal into the CSV: write the current table to a temp file,
+    # rename it over the CSV, then empty the journal. Replaying a journal the
+    # CSV already contains is harmless (adds are keyed by ID), so a crash
+    # between the two steps loses nothing.
+    @synchronized
+    def checkpoint(self):
+        try:
+            with self._file_lock.exclusive():
+                if self.memory_limit is not None:
+                    self._checkpoint_streamed()
+                    return
+                self.refresh()
+                if not self._journal_entries:
+                    return
+                frame = self.df[STORED_COLUMNS]
+                write_csv_atomically(frame, self.path)
+                with open(self.journal_path, "w") as f:
+                    os.fsync(f.fileno())
+                # The reload then comes from the cache instead of re-parsing the CSV
+                dates = np.delete(self._dates, sorted(self._deleted))
+                self._write_cache(frame, dates)
+                self._load()
+        finally:
+            self._checkpointing = False
+
+    # checkpoint() in low-memory mode: the CSV is rewritten a chunk at a time
+    # with the journal applied. Adds a crash left in both the CSV and the
+    # journal are written once. Needs the exclusive file lock.
+    def _checkpoint_streamed(self):
+        entries, _ = read_journal(self.journal_path)
+        if not entries:
+            return
+        if not os.path.exists(self.path):
+            write_csv_atomically(pd.DataFrame(columns=STORED_COLUMNS), self.path)
+        added, deleted, statuses = _journal_changes(entries)
+
+        def apply(chunk):
+            for application_id in chunk[ID_COLUMN].tolist() if added else ():
+                added.pop(application_id, None)
+            return _apply_journal_changes(chunk, deleted, statuses)
+
+        def tail():
+            rows = pd.DataFrame(list(added.values()), columns=STORED_COLUMNS, dtype=str)
+            return _apply_journal_changes(rows, deleted, statuses)
+
+        self._rewrite_in_chunks(apply, tail)
+        with open(self.journal_path, "w") as f:
+            os.fsync(f.fileno())
+        columnar_cache.remove_cache(self.path)
+        self.invalidate()
+
+    # Append one application (a dict keyed by APPLICATION_COLUMNS).
+    # Returns its Application ID.
+    def append(self, record):
+        return self.append_many([record])[0]
+
+    # Append several applications with a single journal write.
+    # The in-memory table and index are updated in place instead of reloading.
+    # With skip_duplicates, records whose key the user already has (or that
+    # repeat an earlier record) are not added.
+    # Returns the new Application IDs, None for each skipped record.
+    @synchronized
+    def append_many(self, records, skip_duplicates=False):
+        rows = [[str(record[col]) for col in APPLICATION_COLUMNS] + [record.get(ID_COLUMN) or new_application_id()]
+                for record in records]
+        if not rows:
+            return []
+
+        with self._file_lock.exclusive():
+            if self.memory_limit is not None:
+                if skip_duplicates:
+                    rows = self._without_duplicates(rows, self._streamed_key_set)
+                new_rows = [row for row in rows if row is not None]
+                if new_rows:
+                    self._write_journal_streamed([{"op": "add", "row": row} for row in new_rows])
+            else:
+                self.refresh()
+                if skip_duplicates:
+                    rows = self._without_duplicates(rows, self._duplicate_index)
+                new_rows = [row for row in rows if row is not None]
+                if new_rows:
+                    self._write_journal([{"op": "add", "row": row} for row in new_rows])
+                    self._apply_adds(new_rows)
+            if new_rows:
+                self._log_changes([{"op": "add", "user": row[0], "id": row[-1], "row": row} for row in new_rows])
+        self._start_checkpoint_if_due()
+        return [None if row is None else row[-1] for row in rows]
+
+    # rows with each duplicate replaced by None; user_keys(username) gives
+    # the keys a user already has (the duplicate index, or a streamed set),
+    # asked once per user
+    def _without_duplicates(self, rows, user_keys):
+        existing = {}
+        seen = set()
+        kept = []
+        for row in rows:
+            key = application_key(row[1], row[2], row[3])
+            if row[0] not in existing:
+                existing[row[0]] = user_keys(row[0])
+            if key in existing[row[0]] or (row[0], key) in seen:
+                kept.append(None)
+            else:
+                seen.add((row[0], key))
+                kept.append(row)
+        return kept
+
+    def _streamed_key_set(self, username):
+        return {key for _, key in self._streamed_keys(username)}
+
+    # Add rows to the in-memory table and every index built so far.
+    # Rows whose ID is already present are skipped, so replay is idempotent.
+    def _apply_adds(self, rows):
+        rows = [row for row in rows if row[-1] not in self._id_positions]
+        if not rows:
+            return
+
+        start = len(self._base) + len(self._pending)
+        for offset, row in enumerate(rows):
+            self._id_positions[row[-1]] = start + offset
+        dates = parse_dates([row[3] for row in rows])
+        self._pending.extend(rows)
+        self._pending_dates.extend(dates)
+        new_positions = {}
+        for offset, row in enumerate(rows):
+            new_positions.setdefault(row[0], []).append(start + offset)
+        for user, positions in new_positions.items():
+            self._last_queries.pop(user, None)
+            existing = self._user_index.get(user, _NO_POSITIONS)
+            self._user_index[user] = np.concatenate([existing, np.array(positions, dtype=np.intp)])
+
+            # Keep any substring indexes already built for this user current
+            for column, index in self._text_indexes.get(user, {}).items():
+                for position in positions:
+                    index.add(position, self._value_at(position, column))
+
+            if user in self._duplicate_indexes:
+                for position in positions:
+                    self._duplicate_indexes[user].setdefault(self._key_at(position), []).append(position)
+
+            if user in self._statistics:
+                for position in positions:
+                    self._statistics[user].add(dates[position - start], rows[position - start][4])
+
+            # Rows arrive in position order, so the date index only needs inserts
+            if user in self._date_indexes:
+                sorted_dates, ordered_positions, valid_count = self._date_indexes[user]
+                for position in positions:
+                    date = dates[position - start]
+                    if np.isnat(date):
+                        slot = len(sorted_dates)
+                    else:
+                        slot = np.searchsorted(sorted_dates[:valid_count], date, side="right")
+                        valid_count += 1
+                    sorted_dates = np.insert(sorted_dates, slot, date)
+                    ordered_positions = np.insert(ordered_positions, slot, position)
+                self._date_indexes[user] = (sorted_dates, ordered_positions, valid_count)
+
+        if len(self._pending) >= PENDING_ROWS_LIMIT:
+            self._consolidate()
+
+
+# Build the (application store, credential store) pair for a backend
+def open_storage(backend, csv_path, credentials_path, database_path):
+    return open_application_store(backend, csv_path, database_path), \
+        open_credential_store(backend, credentials_path, database_path)
+
+
+# Build the applications store for a backend; memory_limit (bytes) turns on
+# low-memory mode
+def open_application_store(backend, csv_path, database_path, memory_limit=None):
+    if backend == "csv":
+        return ApplicationStore(csv_path, memory_limit)
+    if backend == "sqlite":
+        from sqlite_store import SqliteApplicationStore
+        return SqliteApplicationStore(database_path)
+    if backend == "sharded":
+        from sharded_store import ShardedApplicationStore, shard_directory
+        return ShardedApplicationStore(shard_directory(csv_path), memory_limit)
+    raise ValueError(f"Unknown storage backend: {backend!r} (expected one of {', '.join(STORAGE_BACKENDS)})")
@@ -1,23 +1,97 @@
-import pandas as pd
+import time
+PROCESS_START = time.perf_counter()
+
+# Only what the login window needs is imported here. pandas (through
+# job_store) and matplotlib are imported after login, or earlier by the
+# background warm-up while the login window sits idle.
 import ttkbootstrap as ttk
 from ttkbootstrap.constants import *
-from tkinter import messagebox, simpledialog
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import messagebox
 import hashlib
+import logging
 import os
+import sys
 import base64
+import threading
 from datetime import datetime
+import instrumentation
+from instrumentation import timed
+from credential_store import open_credential_store
+from history_view import VirtualHistoryTable
+from background import BackgroundRunner, ProgressDialog
+from exporter import EXPORT_FORMATS, run_export, run_streaming_export
 
 # CSV Files for Data and Credentials
 csv_file = "job_applications.csv"
 credentials_file = "credentials.csv"
+database_file = "job_tracker.db"
+
+# Storage backend: "csv" (default), "sqlite" or "sharded" (one CSV per user)
+storage_backend = os.environ.get("JOB_TRACKER_BACKEND", "csv")
+
+# Low-memory mode for machines that cannot hold every user's applications:
+# with JOB_TRACKER_MEMORY_LIMIT_MB set, the store streams the CSV in chunks
+# sized to stay within that many MB for every operation of the window, and
+# the history table holds one page of HISTORY_PAGE_ROWS rows at a time
+memory_limit_mb = os.environ.get("JOB_TRACKER_MEMORY_LIMIT_MB", "")
+memory_limit = int(float(memory_limit_mb) * 1024 * 1024) if memory_limit_mb else None
+HISTORY_PAGE_ROWS = 200
+
+# Shared stores for applications and credentials; the applications store
+# is opened on first use by open_application_store()
+credential_store = open_credential_store(storage_backend, credentials_file, database_file)
+application_store = None
+application_store_lock = threading.Lock()
+
+# Time from process start to a usable login window that we aim to stay under
+STARTUP_TARGET_SECONDS = 0.5
+
+# Warm the deferred imports once the login window has been idle this long
+WARM_UP_DELAY_MS = 500
+
+logger = logging.getLogger(__name__)
+
+# Delay between the last keystroke and the live search
+SEARCH_DEBOUNCE_MS = 250
 
 # Global variables
 current_window = None
 history_table = None
 username = None
 root = None
+background = None
+viz_windows = {}
+performance_window = None
+
+# How often the Performance window refreshes its figures
+PERFORMANCE_REFRESH_MS = 1000
+
+# The applications store, opened on first use. Opening it imports pandas,
+# so this happens after login or in the warm-up, never before the login window.
+def open_application_store():
+    global application_store
+    with application_store_lock:
+        if application_store is None:
+            from job_store import open_application_store as open_store
+            application_store = open_store(storage_backend, csv_file, database_file, memory_limit)
+    return application_store
+
+# Import pandas and matplotlib and load the applications while the user is
+# still typing their password (runs on a worker thread)
+def warm_up():
+    import matplotlib.figure
+    import matplotlib.backends.backend_tkagg
+    store = open_application_store()
+    # Low-memory mode never loads the whole table up front
+    if memory_limit is None and (storage_backend != "csv" or os.path.exists(csv_file)):
+        store.refresh()
+
+# Record how long the login window took to appear and flag a missed target
+def report_startup_time():
+    elapsed = time.perf_counter() - PROCESS_START
+    instrumentation.record("startup", elapsed * 1000)
+    if elapsed > STARTUP_TARGET_SECONDS:
+        logger.warning("Startup took %.2fs (target %.2fs)", elapsed, STARTUP_TARGET_SECONDS)
 
 # Improved Password Hashing Function
 def hash_password(password, salt=None):
@@ -29,30 +103,51 @@ def hash_password(password, salt=None):
 
 # Verify Password Function
 def verify_password(stored_salt, stored_hash, provided_password):
-    _, new_hash = hash_password(provided_password, stored_salt)
+    with timed("password_verify"):
+        _, new_hash = hash_password(provided_password, stored_salt)
     return new_hash == stored_hash
 
-# Open Visualization Window
-def open_visualizations(username):
-    viz_window = ttk.Toplevel(root)
-    viz_window.title(f"📊 Job Application Statistics - {username}")
-    viz_window.geometry("1000x600")
-
-    # Read the CSV file
-    df = pd.read_csv(csv_file)
-    
-    # Filter data for the current user
-    user_data = df[df["User Name"] == username]
-    
-    # Create a matplotlib figure with two sophisticated subplots
-    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
+# Check a username/password against the credential store.
+# Returns None for an unknown user, otherwise whether the password matches.
+def authenticate(username, password):
+    user = credential_store.lookup(username)
+    if user is None:
+        return None
+
+    # Decode salt and password hash
+    stored_salt = base64.b64decode(user[0])
+    stored_hash = base64.b64decode(user[1])
+    return verify_password(stored_salt, stored_hash, password)
+
+# Store a new user. Returns False if the username is already taken.
+def register_user(username, password):
+    if credential_store.exists(username):
+        return False
+
+    # Hash the password
+    salt, password_hash = hash_password(password)
+
+    # Save new user; another instance may have taken the name meanwhile
+    return credential_store.add(username,
+                                base64.b64encode(salt).decode('utf-8'),
+                                base64.b64encode(password_hash).decode('utf-8'))
+
+# Load chart data from the cached statistics (runs on a worker thread)
+def load_statistics(username):
+    with timed("chart_data") as sample:
+        statistics = application_store.statistics(username)
+        sample.rows = sum(statistics.totals.values())
+        return statistics.progression(), statistics.status_counts()
+
+# Draw the statistics charts into an existing figure (Tk thread)
+def draw_statistics(fig, username, status_progression, status_counts):
+    from matplotlib.artist import setp
+
+    # Reuse the figure: drop the previous axes and create two fresh subplots
+    fig.clear()
+    ax1, ax2 = fig.subplots(1, 2)
     fig.suptitle(f'Job Application Insights for {username}', fontsize=16)
     
-    # Left Plot: Comprehensive Status Breakdown with Trend
-    # Prepare data for status progression
-    user_data['Date Applied'] = pd.to_datetime(user_data['Date Applied'])
-    user_data_sorted = user_data.sort_values('Date Applied')
-    
     # Status color mapping
     status_colors = {
         'Applied': '#2196F3',      # Blue
@@ -61,107 +156,197 @@ def open_visualizations(username):
         'Hired': '#9C27B0'         # Purple
     }
     
-    # Cumulative status count over time
-    status_progression = user_data_sorted.groupby([
-        pd.Grouper(key='Date Applied', freq='W'), 'Status'
-    ]).size().unstack(fill_value=0).cumsum()
-    
-    # Plot stacked area chart
-    status_progression.plot(kind='area', stacked=True, ax=ax1, 
-                             color=[status_colors.get(col, '#607D8B') for col in status_progression.columns])
+    # Left Plot: Comprehensive Status Breakdown with Trend
+    # Cumulative status count over time, one row per week
+    if status_progression.empty:
+        ax1.text(0.5, 0.5, 'No dated applications yet', ha='center', va='center')
+    else:
+        # Plot stacked area chart
+        status_progression.plot(kind='area', stacked=True, ax=ax1, 
+                                 color=[status_colors.get(col, '#607D8B') for col in status_progression.columns])
+        ax1.legend(title='Status', loc='upper left')
     ax1.set_title('Job Application Status Progression')
     ax1.set_xlabel('Date')
     ax1.set_ylabel('Cumulative Applications')
-    ax1.legend(title='Status', loc='upper left')
     
     # Right Plot: Pie Chart with Advanced Styling
-    # Calculate status percentages
-    status_counts = user_data['Status'].value_counts()
-    
-    # Create a more sophisticated pie chart
-    wedges, texts, autotexts = ax2.pie(
-        status_counts, 
-        labels=status_counts.index, 
-        autopct='%1.1f%%',
-        colors=[status_colors.get(status, '#607D8B') for status in status_counts.index],
-        wedgeprops=dict(width=0.6, edgecolor='white'),
-        pctdistance=0.85
-    )
-    
-    # Style the percentage text
-    plt.setp(autotexts, size=9, weight="bold", color="white")
+    if not status_counts.empty:
+        # Create a more sophisticated pie chart
+        wedges, texts, autotexts = ax2.pie(
+            status_counts, 
+            labels=status_counts.index, 
+            autopct='%1.1f%%',
+            colors=[status_colors.get(status, '#607D8B') for status in status_counts.index],
+            wedgeprops=dict(width=0.6, edgecolor='white'),
+            pctdistance=0.85
+        )
+        
+        # Style the percentage text
+        setp(autotexts, size=9, weight="bold", color="white")
+        
+        # Add a legend with total counts
+        legend_labels = [f'{status} ({count})' for status, count in status_counts.items()]
+        ax2.legend(wedges, legend_labels, title="Status Breakdown", 
+                   loc="center left", bbox_to_anchor=(1, 0.5))
     
     ax2.set_title('Application Status Distribution')
     
-    # Add a legend with total counts
-    legend_labels = [f'{status} ({count})' for status, count in status_counts.items()]
-    ax2.legend(wedges, legend_labels, title="Status Breakdown", 
-               loc="center left", bbox_to_anchor=(1, 0.5))
-    
     # Adjust layout
-    plt.tight_layout()
+    fig.tight_layout()
+
+# Open Visualization Window
+def open_visualizations(username):
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+
+    # One window, figure and canvas per user; reopening just redraws them
+    if username in viz_windows:
+        viz_window, fig, canvas = viz_windows[username]
+        viz_window.lift()
+    else:
+        viz_window = ttk.Toplevel(root)
+        viz_window.title(f"📊 Job Application Statistics - {username}")
+        viz_window.geometry("1000x600")
+        viz_window.protocol("WM_DELETE_WINDOW", lambda: close_visualizations(username))
+
+        # Embed matplotlib figure in Tkinter
+        fig = Figure(figsize=(15, 6))
+        canvas = FigureCanvasTkAgg(fig, master=viz_window)
+        canvas_widget = canvas.get_tk_widget()
+        canvas_widget.pack(fill='both', expand=True)
+        viz_windows[username] = (viz_window, fig, canvas)
+
+    def show_statistics(data):
+        with timed("chart_build"):
+            draw_statistics(fig, username, *data)
+        canvas.draw_idle()
+
+    def show_error(e):
+        close_visualizations(username)
+        messagebox.showerror("Error", f"Could not build statistics: {str(e)}")
+
+    background.submit(load_statistics, username, on_done=show_statistics, on_error=show_error,
+                      channel=f"statistics:{username}")
+
+# Close a statistics window and release its figure
+def close_visualizations(username):
+    if username not in viz_windows:
+        return
+    viz_window, fig, canvas = viz_windows.pop(username)
+    fig.clear()
+    canvas.get_tk_widget().destroy()
+    viz_window.destroy()
+
+# Hidden Performance window (Ctrl+Shift+P): recent p50/p95 per operation
+def open_performance_window():
+    global performance_window
+    if performance_window is not None and performance_window.winfo_exists():
+        performance_window.lift()
+        return
+
+    performance_window = ttk.Toplevel(root)
+    performance_window.title("Performance")
+    performance_window.geometry("600x400")
+
+    container = ttk.Frame(performance_window)
+    container.pack(fill='both', expand=True, padx=10, pady=10)
+
+    recording = ttk.BooleanVar(value=instrumentation.enabled)
+
+    def toggle_recording():
+        if recording.get():
+            instrumentation.enable()
+        else:
+            instrumentation.disable()
+
+    ttk.Checkbutton(container, text=f"Record timings (also logged to {instrumentation.LOG_FILE})",
+                    variable=recording, command=toggle_recording).pack(anchor='w', pady=(0, 10))
+
+    columns = ["Operation", "Count", "p50 (ms)", "p95 (ms)", "Last rows"]
+    table = ttk.Treeview(container, columns=columns, show="headings")
+    for col in columns:
+        table.heading(col, text=col)
+        table.column(col, anchor="center", width=110)
+    table.pack(fill='both', expand=True)
+
+    def refresh():
+        if not performance_window.winfo_exists():
+            return
+        table.delete(*table.get_children())
+        for operation, summary in instrumentation.snapshot().items():
+            last_rows = "" if summary["last_rows"] is None else summary["last_rows"]
+            table.insert("", "end", values=(operation, summary["count"], f"{summary['p50_ms']:.1f}",
+                                            f"{summary['p95_ms']:.1f}", last_rows))
+        performance_window.after(PERFORMANCE_REFRESH_MS, refresh)
+
+    refresh()
+
+# Write the export files (runs on a worker thread)
+def write_exports(username, export_filename, extensions, progress):
+    if memory_limit is not None:
+        # Each format streams the user's rows from the file again
+        from job_store import STORED_COLUMNS
+        return run_streaming_export(STORED_COLUMNS,
+                                    lambda: application_store.iter_user_chunks(username, memory_limit),
+                                    export_filename, extensions, progress=progress.report,
+                                    check_cancel=progress.token.check)
+
+    # Current user's rows from the in-memory store
+    user_data = application_store.user_rows(username)
     
-    # Embed matplotlib figure in Tkinter
-    canvas = FigureCanvasTkAgg(fig, master=viz_window)
-    canvas_widget = canvas.get_tk_widget()
-    canvas_widget.pack(fill='both', expand=True)
+    # Formats are written concurrently; Cancel stops them between chunks
+    return run_export(user_data, export_filename, extensions, progress=progress.report,
+                      check_cancel=progress.token.check)
 
 # Export Applications Function
 def export_applications(username):
-    # Read the CSV file
-    df = pd.read_csv(csv_file)
-    
-    # Filter data for the current user
-    user_data = df[df["User Name"] == username]
-    
+    export_window = ttk.Toplevel(root)
+    export_window.title("📥 Export Applications")
+    export_window.geometry("450x220")
+
+    container = ttk.Frame(export_window)
+    container.pack(fill='both', expand=True, padx=20, pady=20)
+
     # Ask user for export location
-    export_filename = simpledialog.askstring("Export", "Enter export filename (without extension):", 
-                                             initialvalue=f"{username}_job_applications")
-    
-    if export_filename:
-        try:
-            # Export to different formats
-            export_formats = [
-                ('Excel', 'xlsx'),
-                ('CSV', 'csv'),
-                ('PDF', 'pdf')
-            ]
-            
-            for format_name, extension in export_formats:
-                full_filename = f"{export_filename}.{extension}"
-                
-                if extension == 'xlsx':
-                    user_data.to_excel(full_filename, index=False)
-                elif extension == 'csv':
-                    user_data.to_csv(full_filename, index=False)
-                elif extension == 'pdf':
-                    from reportlab.lib.pagesizes import letter
-                    from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-                    from reportlab.lib import colors
-                    
-                    doc = SimpleDocTemplate(full_filename, pagesize=letter)
-                    data = [user_data.columns.tolist()] + user_data.values.tolist()
-                    table = Table(data)
-                    
-                    # Add style
-                    table.setStyle(TableStyle([
-                        ('BACKGROUND', (0,0), (-1,0), colors.grey),
-                        ('TEXTCOLOR', (0,0), (-1,0), colors.whitesmoke),
-                        ('ALIGN', (0,0), (-1,-1), 'CENTER'),
-                        ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-                        ('FONTSIZE', (0,0), (-1,0), 12),
-                        ('BOTTOMPADDING', (0,0), (-1,0), 12),
-                        ('BACKGROUND', (0,1), (-1,-1), colors.beige),
-                        ('GRID', (0,0), (-1,-1), 1, colors.black)
-                    ]))
-                    
-                    doc.build([table])
-            
+    ttk.Label(container, text="Enter export filename (without extension):").pack(anchor='w', pady=5)
+    filename_entry = ttk.Entry(container, width=40)
+    filename_entry.pack(anchor='w', pady=5)
+    filename_entry.insert(0, f"{username}_job_applications")
+
+    # Formats to produce
+    formats_frame = ttk.Frame(container)
+    formats_frame.pack(anchor='w', pady=5)
+    format_vars = {}
+    for extension, format_name in EXPORT_FORMATS.items():
+        format_vars[extension] = ttk.BooleanVar(value=True)
+        ttk.Checkbutton(formats_frame, text=format_name, variable=format_vars[extension]).pack(side='left', padx=5)
+
+    def start_export():
+        export_filename = filename_entry.get().strip()
+        extensions = [extension for extension, selected in format_vars.items() if selected.get()]
+
+        if not export_filename or not extensions:
+            messagebox.showwarning("Input Error", "Enter a filename and pick at least one format!")
+            return
+        export_window.destroy()
+
+        progress = ProgressDialog(root, "Exporting Applications", background)
+
+        def on_done(written):
+            progress.close()
+            format_names = ", ".join(extension.upper() for extension in extensions)
             messagebox.showinfo("Export Successful", 
-                                f"Applications exported in XLSX, CSV, and PDF formats!")
-        except Exception as e:
+                                f"Applications exported in {format_names} formats!")
+
+        def on_error(e):
+            progress.close()
             messagebox.showerror("Export Error", f"An error occurred: {str(e)}")
 
+        background.submit(write_exports, username, export_filename, extensions, progress,
+                          on_done=on_done, on_error=on_error)
+
+    ttk.Button(container, text="📥 Export", command=start_export, bootstyle=SUCCESS).pack(pady=10)
+
 # Delete Application Function
 def delete_application(history_table, username):
     # Get selected item
@@ -174,46 +359,114 @@ def delete_application(history_table, username):
         
         # Confirm deletion
         if messagebox.askyesno("Confirm Deletion", "Are you sure you want to delete this application?"):
-            # Get the values of the selected row
-            selected_values = history_table.item(selected_item[0])['values']
-            
-            # Read the CSV file
-            df = pd.read_csv(csv_file)
+            # Table items are keyed by Application ID
+            application_id = selected_item[0]
             
-            # Filter out the row to delete
-            df = df[~((df["User Name"] == username) & 
-                      (df["Company"] == selected_values[0]) & 
-                      (df["Position"] == selected_values[1]) & 
-                      (df["Date Applied"] == selected_values[2]))]
-            
-            # Save the updated DataFrame
-            df.to_csv(csv_file, index=False)
-            
-            # Update the history table
-            update_history_table(history_table, username)
-            
-            messagebox.showinfo("Success", "Application deleted successfully!")
+            def on_done(removed):
+                # Update the history table
+                update_history_table(history_table, username)
+                
+                if not removed:
+                    # Deleted or changed by another instance since the table was filled
+                    messagebox.showwarning("Delete Error", "This application no longer exists.")
+                    return
+                messagebox.showinfo("Success", "Application deleted successfully!")
+
+            def on_error(e):
+                messagebox.showerror("Error", f"An error occurred while deleting: {str(e)}")
+
+            # Tombstone the row in storage
+            background.submit(application_store.delete, username, application_id,
+                              on_done=on_done, on_error=on_error)
     except Exception as e:
         messagebox.showerror("Error", f"An error occurred while deleting: {str(e)}")
 
+# Change the Status of the selected application
+def update_application_status(history_table, username, status):
+    selected_item = history_table.selection()
+    if not selected_item:
+        messagebox.showwarning("Update Error", "Please select an application to update.")
+        return
+
+    def on_done(found):
+        update_history_table(history_table, username)
+
+    def on_error(e):
+        messagebox.showerror("Error", f"An error occurred while updating: {str(e)}")
+
+    # Table items are keyed by Application ID
+    background.submit(application_store.update_status, username, selected_item[0], status,
+                      on_done=on_done, on_error=on_error)
+
 # Update History Table
 def update_history_table(history_table, current_username):
-    # Clear existing items
-    for row in history_table.get_children():
-        history_table.delete(row)
-
-    # Read CSV and filter for current user
-    df = pd.read_csv(csv_file)
-    user_data = df[df["User Name"] == current_username]
-
-    # Insert user's applications
-    for index, row in user_data.iterrows():
-        history_table.insert("", "end", values=(
-            row["Company"], 
-            row["Position"], 
-            row["Date Applied"], 
-            row["Status"]
-        ))
+    if memory_limit is not None:
+        show_history_pages(history_table, current_username)
+        return
+    # Load the user's rows off the Tk thread; only the visible rows are
+    # then turned into Treeview items. A newer refresh or search wins.
+    background.submit(load_history, current_username,
+                      on_done=history_table.show, channel="history")
+
+# Low-memory mode: page the history table from the user's streamed rows,
+# filtered like a search when filters (ApplicationQuery arguments) are
+# given. on_loaded(total) runs after the first page arrives.
+def show_history_pages(history_table, username, filters=None, keep_position=True, on_loaded=None,
+                       on_error=None):
+    first_page = True
+
+    def on_done(page):
+        nonlocal first_page
+        history_table.show_page(*page)
+        if first_page and on_loaded is not None:
+            on_loaded(page[0])
+        first_page = False
+
+    def load_page(offset):
+        # Start a little above the view so scrolling back up stays on the page
+        start = max(0, offset - HISTORY_PAGE_ROWS // 4)
+        background.submit(load_history_page, username, filters, start,
+                          on_done=on_done, on_error=on_error, channel="history")
+
+    history_table.show_paged(load_page, keep_position)
+
+# Create the data file if needed, then run load(username) (runs on a worker
+# thread: initialize waits for the store's lock, which the warm-up's full
+# load may be holding)
+def open_user_data(load, username):
+    application_store.initialize()
+    return load(username)
+
+# A user's rows for the history table (runs on a worker thread)
+def load_history(username):
+    with timed("history") as sample:
+        user_data = application_store.user_rows(username)
+        sample.rows = len(user_data)
+    return user_data
+
+# (rows in all, start, up to HISTORY_PAGE_ROWS rows from start on) of a
+# user's streamed rows, optionally filtered (runs on a worker thread)
+def load_history_page(username, filters, start):
+    from job_store import filter_chunks, page_of_chunks
+    from search_index import ApplicationQuery
+    with timed("history") as sample:
+        chunks = application_store.iter_user_chunks(username, memory_limit)
+        if filters:
+            chunks = filter_chunks(chunks, ApplicationQuery(**filters))
+        total, page = page_of_chunks(chunks, start, HISTORY_PAGE_ROWS)
+        sample.rows = len(page)
+    return total, start, page
+
+# A user's rows with an unreadable Date Applied (runs on a worker thread)
+def load_invalid_dates(username):
+    return application_store.invalid_dates(username)
+
+# Filtered rows for a search (runs on a worker thread)
+def search_applications(username, company, date_from, date_to, position="", status=""):
+    with timed("filter") as sample:
+        user_data = application_store.search(username, company, date_from, date_to, position, status)
+        sample.rows = len(user_data)
+    return user_data
 
 # Login/Register Window Function
 def show_login_register_window(is_register=False):
@@ -284,32 +537,23 @@ def show_login_register_window(is_register=False):
             messagebox.showwarning("Input Error", "Both username and password are required!")
             return
 
-        try:
-            # Load credentials
-            credentials_df = pd.read_csv(credentials_file)
-            
-            # Find user
-            user = credentials_df[credentials_df['Username'] == username]
-            
-            if user.empty:
+        def on_done(verified):
+            if verified is None:
                 messagebox.showwarning("Login Failed", "User not found.")
-                return
-
-            # Decode salt and password hash
-            stored_salt = base64.b64decode(user['Salt'].values[0])
-            stored_hash = base64.b64decode(user['PasswordHash'].values[0])
-
-            # Verify password
-            if verify_password(stored_salt, stored_hash, password):
+            elif verified:
                 current_window.destroy()  # Close login window
                 show_main_window(username)
             else:
                 messagebox.showwarning("Login Failed", "Invalid username or password.")
 
-        except FileNotFoundError:
-            messagebox.showerror("Error", "Credentials file not found. Please register first.")
-        except Exception as e:
-            messagebox.showerror("Error", f"An error occurred: {str(e)}")
+        def on_error(e):
+            if isinstance(e, FileNotFoundError):
+                messagebox.showerror("Error", "Credentials file not found. Please register first.")
+            else:
+                messagebox.showerror("Error", f"An error occurred: {str(e)}")
+
+        # Look up and verify the password off the Tk thread
+        background.submit(authenticate, username, password, on_done=on_done, on_error=on_error)
 
     # Register Function
     def register():
@@ -321,40 +565,27 @@ def show_login_register_window(is_register=False):
             messagebox.showwarning("Input Error", "Both username and password are required!")
             return
 
-        # Load existing credentials
-        try:
-            credentials_df = pd.read_csv(credentials_file)
-        except FileNotFoundError:
-            credentials_df = pd.DataFrame(columns=["Username", "Salt", "PasswordHash"])
-
-        # Check if user already exists
-        if not credentials_df[credentials_df['Username'] == username].empty:
-            messagebox.showwarning("Registration Failed", "Username already exists. Please choose another.")
-            return
-
         # Password complexity checks
         if len(password) < 8:
             messagebox.showwarning("Weak Password", "Password must be at least 8 characters long.")
             return
 
-        # Hash the password
-        salt, password_hash = hash_password(password)
+        def on_done(registered):
+            # Check if user already exists
+            if not registered:
+                messagebox.showwarning("Registration Failed", "Username already exists. Please choose another.")
+                return
 
-        # Prepare new user data
-        new_user = pd.DataFrame({
-            'Username': [username],
-            'Salt': [base64.b64encode(salt).decode('utf-8')],
-            'PasswordHash': [base64.b64encode(password_hash).decode('utf-8')]
-        })
+            messagebox.showinfo("Success", "User registered successfully!")
+            
+            # Switch to login view after successful registration
+            switch_to_login()
 
-        # Append new user and save
-        credentials_df = pd.concat([credentials_df, new_user], ignore_index=True)
-        credentials_df.to_csv(credentials_file, index=False)
+        def on_error(e):
+            messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
-        messagebox.showinfo("Success", "User registered successfully!")
-        
-        # Switch to login view after successful registration
-        switch_to_login()
+        # Save the new user off the Tk thread
+        background.submit(register_user, username, password, on_done=on_done, on_error=on_error)
 
     # Switch between Login and Register views
     def switch_to_login():
@@ -418,17 +649,16 @@ def show_main_window(current_username):
     if current_window:
         current_window.destroy()  # Close the previous window if open
 
-    # Load or Create Data
-    try:
-        df = pd.read_csv(csv_file)
-    except FileNotFoundError:
-        df = pd.DataFrame(columns=["User Name", "Company", "Position", "Date Applied", "Status"])
-        df.to_csv(csv_file, index=False)
+    # Open the store (importing pandas unless the warm-up already did); the
+    # data file is created and rows are loaded in the background
+    from job_store import APPLICATION_STATUSES, ID_COLUMN
+    open_application_store()
 
     # Main Application Window
     current_window = ttk.Toplevel(root)
     current_window.title("🚀 Job Application Tracker")
     current_window.geometry("1200x900")
+    current_window.bind("<Control-P>", lambda event: open_performance_window())
 
     # Style and Background
     style = ttk.Style()
@@ -476,7 +706,7 @@ def show_main_window(current_username):
     ttk.Label(inputs_container, text="Status:").grid(row=3, column=0, sticky='w', padx=5, pady=5)
     status_var = ttk.StringVar(value="Applied")
     status_dropdown = ttk.Combobox(inputs_container, textvariable=status_var, 
-                                   values=["Applied", "Interview", "Rejected", "Hired"], width=37)
+                                   values=APPLICATION_STATUSES, width=37)
     status_dropdown.grid(row=3, column=1, padx=5, pady=5)
 
     # Add Button
@@ -490,35 +720,43 @@ def show_main_window(current_username):
             messagebox.showwarning("Input Error", "All fields must be filled!")
             return
 
-        # Read current dataframe
-        df = pd.read_csv(csv_file)
+        record = {
+            "User Name": username,
+            "Company": company,
+            "Position": position,
+            "Date Applied": date_applied,
+            "Status": status
+        }
 
-        # Create new row
-        new_row = pd.DataFrame({
-            "User Name": [username],
-            "Company": [company],
-            "Position": [position],
-            "Date Applied": [date_applied],
-            "Status": [status]
-        })
+        def on_done(result):
+            # Update history table
+            update_history_table(history_table, username)
 
-        # Concatenate new row
-        df = pd.concat([df, new_row], ignore_index=True)
-        
-        # Save to CSV
-        df.to_csv(csv_file, index=False)
+            # Clear input fields
+            company_entry.delete(0, 'end')
+            position_dropdown.set(job_roles[0])
+            date_entry.delete(0, 'end')
+            date_entry.insert(0, datetime.now().strftime('%Y-%m-%d'))
+            status_var.set("Applied")
 
-        # Update history table
-        update_history_table(history_table, username)
+            messagebox.showinfo("Success", "Application Added Successfully!")
 
-        # Clear input fields
-        company_entry.delete(0, 'end')
-        position_dropdown.set(job_roles[0])
-        date_entry.delete(0, 'end')
-        date_entry.insert(0, datetime.now().strftime('%Y-%m-%d'))
-        status_var.set("Applied")
+        def on_error(e):
+            messagebox.showerror("Error", f"An error occurred while saving: {str(e)}")
 
-        messagebox.showinfo("Success", "Application Added Successfully!")
+        # Ask before saving the same company, position and date twice
+        def on_checked(duplicate_ids):
+            if duplicate_ids and not messagebox.askyesno(
+                    "Possible Duplicate",
+                    f"You already have an application to {company} for {position} on {date_applied}.\n"
+                    f"Add it again anyway?"):
+                return
+            # Append just the new row to the CSV, off the Tk thread
+            background.submit(application_store.append, record, on_done=on_done, on_error=on_error)
+
+        # A hash lookup in the store (a scan of the user's streamed rows in
+        # low-memory mode)
+        background.submit(application_store.duplicates_of, record, on_done=on_checked, on_error=on_error)
 
     add_btn = ttk.Button(inputs_container, text="➕ Add Application", 
                          command=add_application, bootstyle=SUCCESS)
@@ -548,50 +786,89 @@ def show_main_window(current_username):
     date_to_entry.grid(row=0, column=5, padx=5, pady=5)
     date_to_entry.insert(0, "YYYY-MM-DD")
 
+    # Position and Status Search
+    ttk.Label(search_container, text="Position:").grid(row=1, column=0, sticky='w', padx=5, pady=5)
+    position_search_entry = ttk.Entry(search_container, width=30)
+    position_search_entry.grid(row=1, column=1, padx=5, pady=5)
+
+    ttk.Label(search_container, text="Status:").grid(row=1, column=2, sticky='w', padx=5, pady=5)
+    status_search_var = ttk.StringVar(value="Any")
+    status_search_dropdown = ttk.Combobox(search_container, textvariable=status_search_var,
+                                          values=["Any"] + APPLICATION_STATUSES, width=17, state="readonly")
+    status_search_dropdown.grid(row=1, column=3, padx=5, pady=5)
+
     # Search Function
-    def perform_search():
-        # Read CSV
-        df = pd.read_csv(csv_file)
-        
-        # Filter for current user
-        user_data = df[df["User Name"] == username]
-        
+    def perform_search(show_count=True):
         # Get search parameters
-        company_search = company_search_entry.get().strip().lower()
+        company_search = company_search_entry.get().strip()
+        position_search = position_search_entry.get().strip()
+        status_search = status_search_var.get()
         date_from = date_from_entry.get().strip()
         date_to = date_to_entry.get().strip()
         
-        # Apply filters
-        if company_search:
-            user_data = user_data[user_data['Company'].str.lower().str.contains(company_search, case=False, na=False)]
-        
-        if date_from != "YYYY-MM-DD" and date_from:
-            user_data = user_data[pd.to_datetime(user_data['Date Applied']) >= pd.to_datetime(date_from)]
+        # Ignore the date placeholders
+        if date_from == "YYYY-MM-DD":
+            date_from = ""
+        if date_to == "YYYY-MM-DD":
+            date_to = ""
+        if status_search == "Any":
+            status_search = ""
         
-        if date_to != "YYYY-MM-DD" and date_to:
-            user_data = user_data[pd.to_datetime(user_data['Date Applied']) <= pd.to_datetime(date_to)]
-        
-        # Clear existing table
-        for row in history_table.get_children():
-            history_table.delete(row)
-        
-        # Insert filtered results
-        for index, row in user_data.iterrows():
-            history_table.insert("", "end", values=(
-                row["Company"], 
-                row["Position"], 
-                row["Date Applied"], 
-                row["Status"]
-            ))
-        
-        # Show results count
-        result_count = len(user_data)
-        messagebox.showinfo("Search Results", f"Found {result_count} matching applications.")
+        def on_done(user_data):
+            # Show filtered results from the top
+            history_table.show(user_data, keep_position=False)
+            
+            # Show results count
+            if show_count:
+                result_count = len(user_data)
+                messagebox.showinfo("Search Results", f"Found {result_count} matching applications.")
+
+        def on_error(e):
+            if not isinstance(e, ValueError):
+                messagebox.showerror("Error", f"An error occurred while searching: {str(e)}")
+            elif show_count:
+                messagebox.showwarning("Input Error", "Dates must be in YYYY-MM-DD format.")
+
+        if memory_limit is not None:
+            def on_loaded(result_count):
+                if show_count:
+                    messagebox.showinfo("Search Results", f"Found {result_count} matching applications.")
+
+            # Matching rows are paged like the history, from the top
+            filters = dict(company=company_search, position=position_search, status=status_search,
+                           date_from=date_from, date_to=date_to)
+            show_history_pages(history_table, username, filters, keep_position=False, on_loaded=on_loaded,
+                               on_error=on_error)
+            return
+
+        # Apply filters off the Tk thread; results of an older search are dropped
+        background.submit(search_applications, username, company_search, date_from, date_to,
+                          position_search, status_search, on_done=on_done, on_error=on_error, channel="history")
+
+    # Search-as-you-type: rerun the search once typing pauses
+    pending_search = None
+
+    def live_search():
+        nonlocal pending_search
+        pending_search = None
+        perform_search(show_count=False)
+
+    def schedule_live_search(event=None):
+        nonlocal pending_search
+        if pending_search is not None:
+            current_window.after_cancel(pending_search)
+        pending_search = current_window.after(SEARCH_DEBOUNCE_MS, live_search)
+
+    company_search_entry.bind("<KeyRelease>", schedule_live_search)
+    position_search_entry.bind("<KeyRelease>", schedule_live_search)
+    status_search_dropdown.bind("<<ComboboxSelected>>", schedule_live_search)
 
     # Reset Search Function
     def reset_search():
         # Clear search entries
         company_search_entry.delete(0, 'end')
+        position_search_entry.delete(0, 'end')
+        status_search_var.set("Any")
         date_from_entry.delete(0, 'end')
         date_from_entry.insert(0, "YYYY-MM-DD")
         date_to_entry.delete(0, 'end')
@@ -615,13 +892,7 @@ def show_main_window(current_username):
 
     # Columns
     columns = ["Company", "Position", "Date Applied", "Status"]
-    history_table = ttk.Treeview(table_frame, columns=columns, show="headings")
-
-    # Configure columns
-    for col in columns:
-        history_table.heading(col, text=col)
-        history_table.column(col, anchor="center", width=150)
-
+    history_table = VirtualHistoryTable(table_frame, columns, key_column=ID_COLUMN)
     history_table.pack(fill='both', expand=True, padx=10, pady=10)
 
     # Button Frame
@@ -634,6 +905,15 @@ def show_main_window(current_username):
                             bootstyle=DANGER)
     delete_btn.pack(side='left', padx=5)
 
+    # Status Update
+    new_status_var = ttk.StringVar(value=APPLICATION_STATUSES[1])
+    ttk.Combobox(button_frame, textvariable=new_status_var, values=APPLICATION_STATUSES,
+                 width=12, state="readonly").pack(side='left', padx=(5, 0))
+    status_btn = ttk.Button(button_frame, text="✏️ Set Status",
+                            command=lambda: update_application_status(history_table, username, new_status_var.get()),
+                            bootstyle=WARNING)
+    status_btn.pack(side='left', padx=5)
+
     # Visualization Button
     viz_btn = ttk.Button(button_frame, text="📊 View Statistics", 
                          command=lambda current_user=current_username: open_visualizations(current_user), 
@@ -646,22 +926,87 @@ def show_main_window(current_username):
                             bootstyle=SUCCESS)
     export_btn.pack(side='left', padx=5)
 
-    # Update history table
-    update_history_table(history_table, username)
+    # Load the history once the data file exists; a search started meanwhile wins
+    def show_open_error(e):
+        messagebox.showerror("Error", f"An error occurred while loading applications: {str(e)}")
+
+    background.submit(application_store.initialize, on_done=lambda _: update_history_table(history_table, username),
+                      on_error=show_open_error, channel="history")
+
+    # Point out unreadable dates once, instead of failing in a later search
+    def report_invalid_dates(invalid_dates):
+        if len(invalid_dates):
+            examples = ", ".join(f"{row['Company']} ({row['Date Applied']})" for _, row in invalid_dates.head(5).iterrows())
+            messagebox.showwarning("Invalid Dates",
+                                   f"{len(invalid_dates)} applications have an unreadable Date Applied "
+                                   f"and will not match date filters: {examples}")
+
+    background.submit(open_user_data, load_invalid_dates, username, on_done=report_invalid_dates)
 
 # Main function
 def main():
-    global root
+    global root, background
     root = ttk.Window(themename="superhero")
     root.title("Job Application Tracker")
     root.geometry("400x300")
     root.withdraw()  # Hide the main root window initially
 
+    # Worker threads for file I/O, exports and charts
+    background = BackgroundRunner(root)
+
     # Show Login/Register Window initially
     show_login_register_window(is_register=False)
+    root.after_idle(report_startup_time)
+
+    # Load the deferred modules and data in the background; failures here
+    # are not fatal, the same work simply happens again after login
+    root.after(WARM_UP_DELAY_MS, lambda: background.submit(warm_up, on_error=lambda e: None))
 
     root.mainloop()
+    background.shutdown()
+    instrumentation.log_summary()
+
+# Headless bulk import into the configured storage, no window needed:
+#   python job_tracker.py import applications.csv [--user NAME] [--rejects rejected.csv]
+def import_main(argv):
+    import bulk_import
+    return bulk_import.main(argv, store=open_application_store())
+
+# Delta exports for downstream tools, no window needed:
+#   python job_tracker.py changes export --user NAME --checkpoint NAME.json --output delta.csv
+#   python job_tracker.py changes apply previous.csv delta.csv
+def changes_main(argv):
+    import delta_export
+    return delta_export.main(argv, store=open_application_store())
+
+# One-time report of applications saved more than once, no window needed:
+#   python job_tracker.py duplicates [--output duplicates.csv] [--merge]
+def duplicates_main(argv):
+    import dedup_report
+    return dedup_report.main(argv, store=open_application_store())
+
+# Organization-wide report over every user's applications, no window needed:
+#   python job_tracker.py report [--workers 4] [--output report.json]
+def report_main(argv):
+    import org_report
+    return org_report.main(["--backend", storage_backend, "--csv", csv_file, "--db", database_file] + argv)
+
+# Local JSON HTTP API over the same data, no window needed:
+#   python job_tracker.py serve [--host HOST] [--port PORT]
+def serve_main(argv):
+    import api_server
+    return api_server.main(argv)
 
 # Run the application
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["import"]:
+        sys.exit(import_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["changes"]:
+        sys.exit(changes_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["duplicates"]:
+        sys.exit(duplicates_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["report"]:
+        sys.exit(report_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["serve"]:
+        sys.exit(serve_main(sys.argv[2:]))
     main()
\ No newline at end of file
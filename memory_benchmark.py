@@ -0,0 +1,142 @@
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# Ways of running one user's session (first page of history, statistics,
+# adding an application with its duplicate check, deleting it, exporting):
+#   full          - the in-memory store parses the whole CSV (no columnar cache)
+#   full_cached   - the in-memory store loads from the columnar cache (needs pyarrow)
+#   streaming     - low-memory mode, streaming the CSV in chunks
+MODES = ("full", "full_cached", "streaming")
+
+# Default memory limit for the streaming mode, in MB
+DEFAULT_MEMORY_LIMIT_MB = 16
+
+
+# Peak resident set size of this process so far, in MB. Linux's VmHWM
+# starts over at exec; ru_maxrss would include the parent's peak.
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+# Run a user's session in one mode; runs in its own process so the peak RSS
+# belongs to that mode alone. Prints the result as JSON.
+def measure_mode(mode, csv_path, user, memory_limit_mb, extensions, export_directory):
+    import columnar_cache
+    from exporter import run_export, run_streaming_export
+    from job_store import STORED_COLUMNS, ApplicationStore, page_of_chunks
+    baseline = peak_rss_mb()
+
+    memory_limit = int(memory_limit_mb * 1024 * 1024)
+    store = ApplicationStore(csv_path, memory_limit if mode == "streaming" else None)
+    base_filename = os.path.join(export_directory, mode)
+    record = {"User Name": user, "Company": "Benchmark Co", "Position": "Engineer",
+              "Date Applied": "2024-01-01", "Status": "Applied"}
+    start = time.perf_counter()
+    if mode == "full":
+        columnar_cache.remove_cache(csv_path)
+    if mode == "streaming":
+        user_rows, _ = page_of_chunks(store.iter_user_chunks(user, memory_limit), 0, 200)
+    else:
+        user_rows = len(store.user_rows(user))
+    store.statistics(user)
+    store.duplicates_of(record)
+    store.delete(user, store.append(record))
+    if mode == "streaming":
+        run_streaming_export(STORED_COLUMNS, lambda: store.iter_user_chunks(user, memory_limit),
+                             base_filename, extensions)
+    else:
+        run_export(store.user_rows(user), base_filename, extensions, parallel=False)
+    seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "mode": mode,
+        "user_rows": user_rows,
+        "seconds": round(seconds, 3),
+        "baseline_rss_mb": round(baseline, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }))
+
+
+def run_mode(mode, csv_path, user, memory_limit_mb, extensions, export_directory):
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--csv", csv_path, "--user", user,
+               "--memory-limit-mb", str(memory_limit_mb), "--formats", ",".join(extensions),
+               "--export-dir", export_directory]
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare the peak memory of one user's session (history, "
+                                                 "statistics, add, delete, export) with the full in-memory "
+                                                 "load and with low-memory streaming.")
+    parser.add_argument("--rows", type=int, default=1000000, help="applications to generate")
+    parser.add_argument("--users", type=int, default=10000, help="users to generate")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", help="generate into (or reuse with --reuse-data) this directory")
+    parser.add_argument("--reuse-data", action="store_true", help="use the files already in --data-dir")
+    parser.add_argument("--user", help="user to load (default: the one with the most applications)")
+    parser.add_argument("--memory-limit-mb", type=float, default=DEFAULT_MEMORY_LIMIT_MB,
+                        help="memory limit of the streaming mode (JOB_TRACKER_MEMORY_LIMIT_MB)")
+    parser.add_argument("--formats", default="csv", help="comma-separated export formats")
+    parser.add_argument("--output", help="also write the results as JSON to this file")
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--csv", help=argparse.SUPPRESS)
+    parser.add_argument("--export-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    extensions = args.formats.split(",")
+
+    if args.child:
+        measure_mode(args.child, args.csv, args.user, args.memory_limit_mb, extensions, args.export_dir)
+        return 0
+
+    import pandas as pd
+    import columnar_cache
+    from benchmark import generate_dataset
+
+    data_directory = args.data_dir or tempfile.mkdtemp(prefix="tracker-memory-")
+    export_directory = tempfile.mkdtemp(prefix="tracker-memory-export-")
+    try:
+        csv_path = os.path.join(data_directory, "job_applications.csv")
+        if not args.reuse_data:
+            generate_dataset(data_directory, args.rows, args.users, args.seed)
+        user = args.user or pd.read_csv(csv_path, usecols=["User Name"], dtype=str)["User Name"].mode()[0]
+
+        modes = [mode for mode in MODES if mode != "full_cached" or columnar_cache.available()]
+        results = [run_mode(mode, csv_path, user, args.memory_limit_mb, extensions, export_directory)
+                   for mode in modes]
+    finally:
+        shutil.rmtree(export_directory, ignore_errors=True)
+        if not args.data_dir:
+            shutil.rmtree(data_directory, ignore_errors=True)
+
+    print(f"User {user}, memory limit {args.memory_limit_mb:g} MB, formats {args.formats}")
+    print(f"{'mode':12} {'rows':>8} {'seconds':>8} {'baseline MB':>12} {'peak MB':>9} {'added MB':>9}")
+    for result in results:
+        print(f"{result['mode']:12} {result['user_rows']:>8} {result['seconds']:>8.2f} "
+              f"{result['baseline_rss_mb']:>12.1f} {result['peak_rss_mb']:>9.1f} "
+              f"{result['peak_rss_mb'] - result['baseline_rss_mb']:>9.1f}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"user": user, "memory_limit_mb": args.memory_limit_mb, "formats": extensions,
+                       "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from functools import partial
+import numpy as np
+import pandas as pd
+from file_lock import LOCK_SUFFIX, FileLock
+from job_store import (APPLICATION_STATUSES, CHANGES_SUFFIX, ID_COLUMN, JOURNAL_SUFFIX, STORED_COLUMNS,
+                       parse_dates, read_journal)
+from stats_cache import week_ending
+
+# Rows read and aggregated at a time; memory stays around a few chunks
+REPORT_CHUNK_ROWS = 100000
+
+# Companies listed in the report
+TOP_COMPANIES = 10
+
+# Chunks waiting for a worker, per worker; bounds memory in parallel mode
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+# CSV files holding the applications of a backend
+def csv_paths(backend, csv_path):
+    if backend == "csv":
+        return [csv_path]
+    if backend == "sharded":
+        from sharded_store import MANIFEST_NAME, read_manifest, shard_directory
+        directory = shard_directory(csv_path)
+        return [os.path.join(directory, name) for name in read_manifest(os.path.join(directory, MANIFEST_NAME)).values()]
+    raise ValueError(f"Not a CSV backend: {backend!r}")
+
+
+# Changes still in a CSV's journal: ({ID: added row}, deleted IDs, {ID: latest status}).
+# Journals are folded into their CSV every few thousand entries, so this stays small.
+def read_journal_changes(path):
+    added, deleted, statuses = {}, set(), {}
+    entries, _ = read_journal(path + JOURNAL_SUFFIX)
+    for entry in entries:
+        if entry.get("op") == "add":
+            added.setdefault(entry["row"][-1], entry["row"])
+        elif entry.get("op") == "delete":
+            deleted.add(entry["id"])
+        elif entry.get("op") == "status":
+            statuses[entry["id"]] = entry["status"]
+    return added, deleted, statuses
+
+
+# ID -> first time the application moved to Interview, from change-log
+# entries of the form {"op": "status", "id": ..., "status": ..., "time": ...}
+def first_interview_times(entries):
+    times = {}
+    for entry in entries:
+        if entry.get("op") == "status" and entry.get("status") == "Interview":
+            times.setdefault(entry["id"], entry["time"])
+    series = pd.Series(times, dtype=object)
+    return pd.to_datetime(series, utc=True, errors="coerce").dt.tz_localize(None).astype("datetime64[ns]")
+
+
+# Change-log entries of CSV backends, one line at a time; with marker
+# (bytes), lines without it are skipped before parsing
+def iter_change_log(paths, marker=None):
+    for path in paths:
+        try:
+            with open(path + CHANGES_SUFFIX, "rb") as f:
+                for line in f:
+                    if marker is not None and marker not in line:
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+        except FileNotFoundError:
+            continue
+
+
+# First Interview times of the applications in ids, from the change logs
+# of CSVs. Each chunk scans the logs again, so memory follows the chunk,
+# not the length of the history.
+def csv_interview_times(paths, ids):
+    return first_interview_times(entry for entry in iter_change_log(paths, b'"Interview"')
+                                 if entry.get("id") in ids)
+
+
+# The same from a SQLite database, joining its changes to the chunk's IDs
+def sqlite_interview_times(database_path, ids):
+    connection = sqlite3.connect(database_path)
+    try:
+        connection.execute("CREATE TEMP TABLE chunk_ids (id TEXT PRIMARY KEY)")
+        connection.executemany("INSERT OR IGNORE INTO chunk_ids VALUES (?)",
+                               ((application_id,) for application_id in ids))
+        rows = connection.execute(
+            "SELECT application_id, changed_at, data FROM changes JOIN chunk_ids ON chunk_ids.id = application_id "
+            "WHERE op = 'status' ORDER BY seq")
+        return first_interview_times({"op": "status", "id": application_id, "time": changed_at, **json.loads(data)}
+                                     for application_id, changed_at, data in rows)
+    finally:
+        connection.close()
+
+
+# Applications as (chunk of text columns, deleted IDs, {ID: latest status},
+# interview_times(ids)) items: each CSV, then its journal adds. A CSV is
+# opened and its journal read under one shared lock, as
+# ApplicationStore.iter_user_chunks does, so a checkpoint cannot fold the
+# journal in between and count rows twice. The CSV is only ever replaced by
+# a rename, so the open file stays consistent. Adds replayed after a crash
+# may already be in the CSV; those are counted once.
+def iter_csv_chunks(paths, chunk_rows):
+    for path in paths:
+        interview_times = partial(csv_interview_times, [path])
+        with FileLock(path + LOCK_SUFFIX).shared():
+            try:
+                f = open(path, newline="", encoding="utf-8")
+            except FileNotFoundError:
+                f = None
+            added, deleted, statuses = read_journal_changes(path)
+        if f is not None:
+            with f, pd.read_csv(f, dtype=str, keep_default_na=False, chunksize=chunk_rows) as reader:
+                for chunk in reader:
+                    if added and ID_COLUMN in chunk.columns:
+                        for application_id in chunk[ID_COLUMN].tolist():
+                            added.pop(application_id, None)
+                    yield chunk, deleted, statuses, interview_times
+        added = list(added.values())
+        for start in range(0, len(added), chunk_rows):
+            yield (pd.DataFrame(added[start:start + chunk_rows], columns=STORED_COLUMNS, dtype=str),
+                   deleted, statuses, interview_times)
+
+
+# SQLite has no journal, so its items carry no changes
+def iter_sqlite_chunks(connection, database_path, chunk_rows):
+    from sqlite_store import _SELECT_APPLICATIONS
+    interview_times = partial(sqlite_interview_times, database_path)
+    for chunk in pd.read_sql_query(_SELECT_APPLICATIONS, connection, dtype=str, chunksize=chunk_rows):
+        yield chunk, frozenset(), {}, interview_times
+
+
+# Aggregates of one chunk, small enough to send back from a worker. Company
+# counts are keyed like application_key (stripped and casefolded), and the
+# spellings seen are counted too so the report can show the usual one.
+# interview_times(ids) gives the first Interview time of those IDs.
+def aggregate_chunk(chunk, deleted_ids, journal_statuses, interview_times):
+    # Rows written before Application IDs existed have none yet
+    if ID_COLUMN not in chunk.columns:
+        chunk = chunk.assign(**{ID_COLUMN: ""})
+    if deleted_ids:
+        chunk = chunk[~chunk[ID_COLUMN].isin(deleted_ids)]
+    statuses = chunk["Status"]
+    if journal_statuses:
+        statuses = chunk[ID_COLUMN].map(pd.Series(journal_statuses, dtype=object)).fillna(statuses)
+    companies = chunk["Company"].str.strip()
+    company_keys = companies.str.casefold()
+
+    dates = parse_dates(chunk["Date Applied"])
+    dated = ~np.isnat(dates)
+    weeks, week_counts = np.unique(week_ending(dates[dated]), return_counts=True)
+
+    # Days from Date Applied to the first move to Interview
+    days = np.empty(0)
+    times = interview_times(set(chunk[ID_COLUMN].tolist()) - {""})
+    if len(times):
+        interviewed = chunk[ID_COLUMN].map(times).to_numpy(dtype="datetime64[ns]")
+        timed = dated & ~np.isnat(interviewed)
+        days = (interviewed[timed] - dates[timed]) / np.timedelta64(1, "D")
+
+    return {
+        "applications": len(chunk),
+        "users": chunk["User Name"].unique().tolist(),
+        "status_counts": statuses.value_counts().to_dict(),
+        "company_counts": company_keys.value_counts().to_dict(),
+        "company_names": list(pd.DataFrame({"key": company_keys, "name": companies})
+                              .value_counts().to_dict().items()),
+        "weekly_counts": dict(zip(np.datetime_as_string(weeks, unit="D").tolist(), week_counts.tolist())),
+        "interview_days": (float(days.sum()), int(len(days))),
+    }
+
+
+# Partial aggregates merged as they arrive; grows with distinct users,
+# companies and weeks, never with rows
+class ReportTotals:
+    def __init__(self):
+        self.applications = 0
+        self.users = set()
+        self.status_counts = Counter()
+        self.company_counts = Counter()
+        # (company key, spelling) -> rows
+        self.company_names = Counter()
+        self.weekly_counts = Counter()
+        self.interview_days = 0.0
+        self.interview_count = 0
+
+    def add(self, partial):
+        self.applications += partial["applications"]
+        self.users.update(partial["users"])
+        self.status_counts.update(partial["status_counts"])
+        self.company_counts.update(partial["company_counts"])
+        self.company_names.update(dict(partial["company_names"]))
+        self.weekly_counts.update(partial["weekly_counts"])
+        self.interview_days += partial["interview_days"][0]
+        self.interview_count += partial["interview_days"][1]
+
+    # Funnel rates by current status: an application that reached Interview
+    # is now at Interview or Hired
+    def report(self, top=TOP_COMPANIES):
+        # Each company under its most frequent spelling
+        names = {}
+        for (key, name), count in self.company_names.most_common():
+            names.setdefault(key, name)
+        total = self.applications
+        reached_interview = self.status_counts["Interview"] + self.status_counts["Hired"]
+        rate = lambda count, of: round(count / of, 4) if of else 0.0
+        return {
+            "applications": total,
+            "users": len(self.users),
+            "status_counts": {status: self.status_counts[status] for status in APPLICATION_STATUSES},
+            "funnel": {
+                "interview_rate": rate(reached_interview, total),
+                "hire_rate": rate(self.status_counts["Hired"], total),
+                "interview_to_hire_rate": rate(self.status_counts["Hired"], reached_interview),
+                "rejection_rate": rate(self.status_counts["Rejected"], total),
+            },
+            "weekly_volume": dict(sorted(self.weekly_counts.items())),
+            "top_companies": [(names[key], count) for key, count in self.company_counts.most_common(top)],
+            "applied_to_interview_days": {
+                "mean": round(self.interview_days / self.interview_count, 2) if self.interview_count else None,
+                "applications": self.interview_count,
+            },
+        }
+
+
+# Yield fn(*item) for every item using the pool, keeping at most in_flight
+# items submitted so the input is never read far ahead of the workers
+def _map_bounded(pool, fn, items, in_flight):
+    pending = set()
+    for item in items:
+        pending.add(pool.submit(fn, *item))
+        if len(pending) >= in_flight:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    for future in pending:
+        yield future.result()
+
+
+# Aggregate every user's applications in one streaming pass.
+# workers > 1 spreads the chunks over that many processes.
+def build_report(backend, csv_path, database_path, chunk_rows=REPORT_CHUNK_ROWS, workers=1, top=TOP_COMPANIES):
+    connection = None
+    if backend == "sqlite":
+        connection = sqlite3.connect(database_path)
+        chunks = iter_sqlite_chunks(connection, database_path, chunk_rows)
+    else:
+        chunks = iter_csv_chunks(csv_paths(backend, csv_path), chunk_rows)
+
+    totals = ReportTotals()
+    try:
+        if workers > 1:
+            # "spawn" keeps Tk and the worker threads out of the child processes
+            context = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                for aggregate in _map_bounded(pool, aggregate_chunk, chunks, workers * CHUNKS_IN_FLIGHT_PER_WORKER):
+                    totals.add(aggregate)
+        else:
+            for item in chunks:
+                totals.add(aggregate_chunk(*item))
+    finally:
+        if connection is not None:
+            connection.close()
+    return totals.report(top)
+
+
+def format_report(report):
+    lines = [f"Applications: {report['applications']} from {report['users']} users", "", "Status funnel:"]
+    for status, count in report["status_counts"].items():
+        lines.append(f"  {status:10} {count:>10}")
+    for name, value in report["funnel"].items():
+        lines.append(f"  {name.replace('_', ' '):24} {value:.1%}")
+    days = report["applied_to_interview_days"]
+    if days["mean"] is not None:
+        lines.append(f"  Applied to Interview: {days['mean']} days on average ({days['applications']} applications)")
+    lines += ["", "Top companies:"]
+    lines += [f"  {company:30} {count:>8}" for company, count in report["top_companies"]]
+    lines += ["", "Weekly volume (last 12 weeks):"]
+    lines += [f"  {week} {count:>8}" for week, count in list(report["weekly_volume"].items())[-12:]]
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report on every user's applications: status funnel, weekly "
+                                                 "volume, top companies and time to interview.")
+    parser.add_argument("--backend", default=os.environ.get("JOB_TRACKER_BACKEND", "csv"),
+                        choices=["csv", "sqlite", "sharded"])
+    parser.add_argument("--csv", default="job_applications.csv")
+    parser.add_argument("--db", default="job_tracker.db")
+    parser.add_argument("--chunk-rows", type=int, default=REPORT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1, help="processes to aggregate chunks in")
+    parser.add_argument("--top", type=int, default=TOP_COMPANIES, help="companies to list")
+    parser.add_argument("--output", help="also write the full report as JSON to this file")
+    args = parser.parse_args(argv)
+
+    report = build_report(args.backend, args.csv, args.db, args.chunk_rows, args.workers, args.top)
+    print(format_report(report))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+from collections import defaultdict
+import numpy as np
+import pandas as pd
+
+# Substrings shorter than this cannot use the index and fall back to a scan
+GRAM_SIZE = 3
+
+
+def _grams(text):
+    return {text[i:i + GRAM_SIZE] for i in range(len(text) - GRAM_SIZE + 1)}
+
+
+# Lowercase trigram index for case-insensitive substring search over one
+# text column. A query only looks at rows that contain every trigram of
+# the query, then confirms the match on those candidates.
+class TrigramIndex:
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._texts = {}
+
+    @classmethod
+    def build(cls, keys, texts):
+        index = cls()
+        for key, text in zip(keys, texts):
+            index.add(key, text)
+        return index
+
+    def __len__(self):
+        return len(self._texts)
+
+    def add(self, key, text):
+        text = str(text).lower()
+        self._texts[key] = text
+        for gram in _grams(text):
+            self._postings[gram].add(key)
+
+    def remove(self, key):
+        text = self._texts.pop(key, None)
+        if text is None:
+            return
+        for gram in _grams(text):
+            keys = self._postings.get(gram)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._postings[gram]
+
+    # Keys whose text contains query, ignoring case
+    def search(self, query):
+        query = query.lower()
+        if len(query) < GRAM_SIZE:
+            return {key for key, text in self._texts.items() if query in text}
+
+        postings = []
+        for gram in _grams(query):
+            keys = self._postings.get(gram)
+            if not keys:
+                return set()
+            postings.append(keys)
+
+        # Intersect from the rarest trigram up so the working set stays small
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for keys in postings[1:]:
+            candidates &= keys
+            if not candidates:
+                return candidates
+        return {key for key in candidates if query in self._texts[key]}
+
+    # Upper bound on len(search(query)) without intersecting: the size of
+    # the rarest trigram's posting list
+    def estimate(self, query):
+        query = query.lower()
+        if len(query) < GRAM_SIZE:
+            return len(self._texts)
+        return min(len(self._postings.get(gram, ())) for gram in _grams(query))
+
+    # Those of keys whose text contains query, ignoring case, in the given order
+    def filter(self, keys, query):
+        query = query.lower()
+        return [key for key in keys if query in self._texts[key]]
+
+
+# Search filters normalized for comparison: Company and Position are
+# case-insensitive substrings, Status is exact, and the dates are an
+# inclusive range. Empty filters match everything.
+class ApplicationQuery:
+    def __init__(self, company="", position="", status="", date_from=None, date_to=None):
+        self.company = (company or "").strip().lower()
+        self.position = (position or "").strip().lower()
+        self.status = (status or "").strip()
+        # Raises ValueError for a date pandas cannot read
+        self.date_from = np.datetime64(pd.to_datetime(date_from), "ns") if date_from else None
+        self.date_to = np.datetime64(pd.to_datetime(date_to), "ns") if date_to else None
+
+    def is_empty(self):
+        return not (self.company or self.position or self.status or
+                    self.date_from is not None or self.date_to is not None)
+
+    # True if every row matching this query also matches previous, so the
+    # answer can be found by filtering previous's result
+    def narrows(self, previous):
+        return (previous.company in self.company and
+                previous.position in self.position and
+                previous.status in ("", self.status) and
+                (previous.date_from is None or
+                 (self.date_from is not None and self.date_from >= previous.date_from)) and
+                (previous.date_to is None or
+                 (self.date_to is not None and self.date_to <= previous.date_to)))
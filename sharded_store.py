@@ -0,0 +1,281 @@
+import argparse
+import collections
+import hashlib
+import json
+import os
+import threading
+import numpy as np
+import pandas as pd
+from file_lock import LOCK_SUFFIX, FileLock
+from job_store import (ID_COLUMN, STORED_COLUMNS, ApplicationStore, read_applications_snapshot, synchronized,
+                       write_csv_atomically)
+from stats_cache import StatusStatistics
+
+# The shards of job_applications.csv live under job_applications<SHARD_DIRECTORY_SUFFIX>
+SHARD_DIRECTORY_SUFFIX = ".shards"
+
+# Lists every user and the shard holding their rows
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+# A shard sits under two levels of directories named after its hash
+# (ab/cd/abcd....csv), so no directory holds more than 256 entries
+SHARD_FAN_OUT_LEVELS = 2
+SHARD_FAN_OUT_WIDTH = 2
+
+# Loaded shards kept in memory; the least recently used one is dropped beyond this
+MAX_OPEN_SHARDS = 64
+
+
+def shard_directory(csv_path):
+    return os.path.splitext(csv_path)[0] + SHARD_DIRECTORY_SUFFIX
+
+
+# Shard file of a user, relative to the shard directory
+def shard_name(username):
+    digest = hashlib.sha256(username.encode("utf-8")).hexdigest()
+    levels = [digest[level * SHARD_FAN_OUT_WIDTH:(level + 1) * SHARD_FAN_OUT_WIDTH]
+              for level in range(SHARD_FAN_OUT_LEVELS)]
+    return "/".join(levels + [digest + ".csv"])
+
+
+def read_manifest(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise ValueError(f"{path}: unsupported manifest format {manifest.get('format')!r}")
+    return manifest["users"]
+
+
+def write_manifest(path, users):
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"format": MANIFEST_FORMAT, "users": users}, f, indent=1, sort_keys=True)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+
+# Applications partitioned into one ApplicationStore per user, with the
+# same interface as ApplicationStore. A user's history, search, statistics,
+# export, adds and deletes read and rewrite only that user's shard; only
+# df and users() look across shards. memory_limit puts every shard in
+# low-memory mode.
+class ShardedApplicationStore:
+    def __init__(self, directory, memory_limit=None):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.manifest_path = os.path.join(directory, MANIFEST_NAME)
+        self._manifest_lock = FileLock(self.manifest_path + LOCK_SUFFIX)
+        self._lock = threading.RLock()
+        # username -> shard path relative to the directory
+        self._users = {}
+        self._manifest_signature = None
+        # username -> ApplicationStore, in least recently used order
+        self._shards = collections.OrderedDict()
+
+    def _manifest_file_signature(self):
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    @synchronized
+    def _refresh_manifest(self):
+        signature = self._manifest_file_signature()
+        if signature != self._manifest_signature:
+            self._users = read_manifest(self.manifest_path)
+            self._manifest_signature = signature
+
+    # The loaded shard of a user, opening it on first use
+    @synchronized
+    def _shard(self, username):
+        shard = self._shards.get(username)
+        if shard is not None:
+            self._shards.move_to_end(username)
+            return shard
+
+        path = os.path.join(self.directory, self._users.get(username) or shard_name(username))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        shard = self._shards[username] = ApplicationStore(path, self.memory_limit)
+        if len(self._shards) > MAX_OPEN_SHARDS:
+            self._shards.popitem(last=False)
+        return shard
+
+    # Whether a user has a shard; reads for anyone else return empty results
+    # without creating a shard directory or file
+    def _known(self, username):
+        self._refresh_manifest()
+        return username in self._users
+
+    # Record a user in the manifest before their first row is written
+    def _add_user(self, username):
+        self._refresh_manifest()
+        if username in self._users:
+            return
+        with self._manifest_lock.exclusive():
+            users = read_manifest(self.manifest_path)
+            if username not in users:
+                users[username] = shard_name(username)
+                write_manifest(self.manifest_path, users)
+        self._refresh_manifest()
+
+    @synchronized
+    def initialize(self):
+        os.makedirs(self.directory, exist_ok=True)
+        with self._manifest_lock.exclusive():
+            if not os.path.exists(self.manifest_path):
+                write_manifest(self.manifest_path, {})
+        self._refresh_manifest()
+
+    # Shards catch up on their own when they are next used
+    def refresh(self):
+        self._refresh_manifest()
+
+    @synchronized
+    def invalidate(self):
+        self._manifest_signature = None
+        for shard in self._shards.values():
+            shard.invalidate()
+
+    # Every user's rows; reads every shard
+    @property
+    def df(self):
+        frames = [self._shard(username).df for username in self.users()]
+        if not frames:
+            return pd.DataFrame(columns=STORED_COLUMNS, dtype=str)
+        return pd.concat(frames, ignore_index=True)
+
+    def users(self):
+        self._refresh_manifest()
+        return list(self._users)
+
+    def user_positions(self, username):
+        if not self._known(username):
+            return np.array([], dtype=np.intp)
+        return self._shard(username).user_positions(username)
+
+    def user_rows(self, username):
+        if not self._known(username):
+            return pd.DataFrame(columns=STORED_COLUMNS, dtype=str)
+        return self._shard(username).user_rows(username)
+
+    def user_dates(self, username):
+        if not self._known(username):
+            return pd.Series([], dtype="datetime64[ns]", name="Date Applied")
+        return self._shard(username).user_dates(username)
+
+    def invalid_dates(self, username):
+        if not self._known(username):
+            return pd.DataFrame(columns=STORED_COLUMNS, dtype=str)
+        return self._shard(username).invalid_dates(username)
+
+    def statistics(self, username):
+        if not self._known(username):
+            return StatusStatistics()
+        return self._shard(username).statistics(username)
+
+    def search(self, username, company="", date_from=None, date_to=None, position="", status=""):
+        if not self._known(username):
+            return pd.DataFrame(columns=STORED_COLUMNS, dtype=str)
+        return self._shard(username).search(username, company, date_from, date_to, position, status)
+
+    def iter_user_chunks(self, username, memory_limit):
+        if not self._known(username):
+            return iter(())
+        return self._shard(username).iter_user_chunks(username, memory_limit)
+
+    def delete(self, username, application_id):
+        if not self._known(username):
+            return 0
+        return self._shard(username).delete(username, application_id)
+
+    def duplicates_of(self, record):
+        if not self._known(str(record["User Name"])):
+            return []
+        return self._shard(str(record["User Name"])).duplicates_of(record)
+
+    def update_status(self, username, application_id, status):
+        if not self._known(username):
+            return 0
+        return self._shard(username).update_status(username, application_id, status)
+
+    # Sequence numbers are per shard, i.e. per user
+    def changes_since(self, username, since=0):
+        if not self._known(username):
+            return [], since
+        return self._shard(username).changes_since(username, since)
+
+    def change_snapshot(self, username):
+        if not self._known(username):
+            return pd.DataFrame(columns=STORED_COLUMNS, dtype=str), 0
+        return self._shard(username).change_snapshot(username)
+
+    def append(self, record):
+        return self.append_many([record])[0]
+
+    # Rows are grouped by user so each shard gets a single journal write.
+    # Returns the new Application IDs in the order of records (None for
+    # duplicates skipped with skip_duplicates).
+    def append_many(self, records, skip_duplicates=False):
+        by_user = collections.defaultdict(list)
+        for number, record in enumerate(records):
+            by_user[str(record["User Name"])].append(number)
+
+        ids = [None] * len(records)
+        for username, numbers in by_user.items():
+            self._add_user(username)
+            shard_ids = self._shard(username).append_many([records[number] for number in numbers], skip_duplicates)
+            for number, application_id in zip(numbers, shard_ids):
+                ids[number] = application_id
+        return ids
+
+    # Fold the journal of every loaded shard into its CSV
+    def checkpoint(self):
+        with self._lock:
+            shards = list(self._shards.values())
+        for shard in shards:
+            shard.checkpoint()
+
+
+# Split the single applications CSV into per-user shards and a manifest.
+# The CSV is left in place and untouched (IDs missing from it are assigned
+# in the shards only); refuses to run if the shards already hold users.
+def migrate_csv_to_shards(csv_path, directory):
+    store = ShardedApplicationStore(directory)
+    if store.users():
+        raise RuntimeError(f"{directory} already contains shards; refusing to migrate again")
+    store.initialize()
+
+    # Journal adds, deletes and status changes applied, in memory only
+    applications = read_applications_snapshot(csv_path)
+    users = {}
+    migrated_ids = []
+    for username, positions in applications.groupby("User Name", sort=False).indices.items():
+        users[username] = shard_name(username)
+        path = os.path.join(directory, users[username])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_csv_atomically(applications.iloc[positions], path)
+        migrated_ids.extend(pd.read_csv(path, usecols=[ID_COLUMN], dtype=str)[ID_COLUMN].tolist())
+
+    # Every row must have landed in exactly one shard before the manifest points at them
+    if len(migrated_ids) != len(applications) or set(migrated_ids) != set(applications[ID_COLUMN].tolist()):
+        raise RuntimeError(f"{directory}: shard contents do not match {csv_path}")
+    with store._manifest_lock.exclusive():
+        write_manifest(store.manifest_path, users)
+    return len(applications), len(users)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split the applications CSV into per-user shards.")
+    parser.add_argument("--csv", default="job_applications.csv")
+    parser.add_argument("--directory", help="shard directory (default: next to the CSV, ending in .shards)")
+    args = parser.parse_args()
+
+    directory = args.directory or shard_directory(args.csv)
+    application_count, user_count = migrate_csv_to_shards(args.csv, directory)
+    print(f"Migrated {application_count} applications for {user_count} users into {directory}")
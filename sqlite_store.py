@@ -0,0 +1,324 @@
+import argparse
+import json
+import sqlite3
+import threading
+from datetime import datetime, timezone
+import pandas as pd
+from job_store import (APPLICATION_COLUMNS, ID_COLUMN, ApplicationStore, application_key, new_application_id,
+                       parse_dates)
+from stats_cache import StatusStatistics
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS applications (
+    id INTEGER PRIMARY KEY,
+    user_name TEXT NOT NULL,
+    company TEXT NOT NULL,
+    position TEXT NOT NULL,
+    date_applied TEXT NOT NULL,
+    status TEXT NOT NULL,
+    application_id TEXT,
+    dedup_key TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_applications_user_date ON applications (user_name, date_applied);
+CREATE TABLE IF NOT EXISTS changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    changed_at TEXT NOT NULL,
+    op TEXT NOT NULL,
+    user_name TEXT NOT NULL,
+    application_id TEXT NOT NULL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_changes_user_seq ON changes (user_name, seq);
+CREATE TABLE IF NOT EXISTS credentials (
+    username TEXT PRIMARY KEY,
+    salt TEXT NOT NULL,
+    password_hash TEXT NOT NULL
+);
+"""
+
+# Application columns as they come back from SELECT, in CSV order
+_SELECT_APPLICATIONS = """
+SELECT user_name AS "User Name", company AS "Company", position AS "Position",
+       date_applied AS "Date Applied", status AS "Status", application_id AS "Application ID"
+FROM applications
+"""
+
+_INSERT_APPLICATION = """
+INSERT INTO applications (user_name, company, position, date_applied, status, application_id, dedup_key)
+VALUES (?1, ?2, ?3, ?4, ?5, ?6, application_key(?1, ?2, ?3, ?4))
+"""
+
+
+# User Name plus application_key as one indexed text value
+def _dedup_key(username, company, position, date_applied):
+    return "\x1f".join((username,) + application_key(company, position, date_applied))
+
+
+# Open a database with the tracker schema; WAL lets readers run alongside a writer
+def connect(database_path):
+    connection = sqlite3.connect(database_path, check_same_thread=False)
+    connection.create_function("application_key", 4, _dedup_key, deterministic=True)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+
+    # Databases created before Application IDs existed get the column and random IDs
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(applications)")]
+    with connection:
+        if "application_id" not in columns:
+            connection.execute("ALTER TABLE applications ADD COLUMN application_id TEXT")
+        connection.execute("UPDATE applications SET application_id = lower(hex(randomblob(16))) "
+                           "WHERE application_id IS NULL")
+        connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_applications_id ON applications (application_id)")
+        # Company searches are substring matches (LIKE '%x%'), which no index
+        # on company can serve; they filter the user's rows found through
+        # idx_applications_user_date instead
+        connection.execute("DROP INDEX IF EXISTS idx_applications_company")
+        # Duplicate lookups go through an index on the normalized key
+        if "dedup_key" not in columns:
+            connection.execute("ALTER TABLE applications ADD COLUMN dedup_key TEXT")
+        connection.execute("CREATE INDEX IF NOT EXISTS idx_applications_dedup ON applications (dedup_key)")
+        connection.execute("UPDATE applications SET dedup_key = application_key(user_name, company, position, "
+                           "date_applied) WHERE dedup_key IS NULL")
+    return connection
+
+
+# Escape LIKE wildcards so a search for "a_b" or "50%" matches literally
+def _like_pattern(text):
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+# Date bounds are compared as ISO text, which is how the form writes them
+def _iso_date(value):
+    return pd.to_datetime(value).strftime("%Y-%m-%d")
+
+
+# SQLite-backed applications table with the same interface as ApplicationStore.
+# History, search and delete are indexed queries on (user_name, date_applied).
+class SqliteApplicationStore:
+    def __init__(self, path):
+        self.path = path
+        self._connection = connect(path)
+        self._lock = threading.Lock()
+
+    def initialize(self):
+        pass
+
+    def refresh(self):
+        pass
+
+    def invalidate(self):
+        pass
+
+    def _query(self, where="", params=()):
+        sql = _SELECT_APPLICATIONS + where + " ORDER BY id"
+        with self._lock:
+            return pd.read_sql_query(sql, self._connection, params=params, dtype=str)
+
+    @property
+    def df(self):
+        return self._query()
+
+    def user_rows(self, username):
+        return self._query("WHERE user_name = ?", (username,))
+
+    # The query already reads only the user's rows, so they come as one chunk
+    def iter_user_chunks(self, username, memory_limit):
+        yield self.user_rows(username)
+
+    def user_dates(self, username):
+        user_data = self.user_rows(username)
+        return pd.Series(parse_dates(user_data["Date Applied"]), index=user_data.index, name="Date Applied")
+
+    def invalid_dates(self, username):
+        user_data = self.user_rows(username)
+        return user_data[pd.isna(parse_dates(user_data["Date Applied"]))]
+
+    # Status counts per day from SQL, folded into weekly statistics
+    def statistics(self, username):
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT date_applied, status, COUNT(*) FROM applications "
+                "WHERE user_name = ? GROUP BY date_applied, status", (username,)).fetchall()
+        dates, statuses, counts = zip(*rows) if rows else ((), (), ())
+        return StatusStatistics.build(parse_dates(dates), statuses, counts)
+
+    def users(self):
+        with self._lock:
+            rows = self._connection.execute("SELECT DISTINCT user_name FROM applications").fetchall()
+        return [row[0] for row in rows]
+
+    def search(self, username, company="", date_from=None, date_to=None, position="", status=""):
+        where = "WHERE user_name = ?"
+        params = [username]
+        if date_from:
+            where += " AND date_applied >= ?"
+            params.append(_iso_date(date_from))
+        if date_to:
+            where += " AND date_applied <= ?"
+            params.append(_iso_date(date_to))
+        if company:
+            where += " AND company LIKE ? ESCAPE '\\'"
+            params.append(_like_pattern(company))
+        if position:
+            where += " AND position LIKE ? ESCAPE '\\'"
+            params.append(_like_pattern(position))
+        if status:
+            where += " AND status = ?"
+            params.append(status)
+        return self._query(where, params)
+
+    def append(self, record):
+        return self.append_many([record])[0]
+
+    def duplicates_of(self, record):
+        key = _dedup_key(str(record["User Name"]), record["Company"], record["Position"], record["Date Applied"])
+        with self._lock:
+            return [row[0] for row in self._connection.execute(
+                "SELECT application_id FROM applications WHERE dedup_key = ? ORDER BY id", (key,))]
+
+    # Duplicates are checked inside the insert transaction, one index lookup per row
+    def append_many(self, records, skip_duplicates=False):
+        rows = [[str(record[col]) for col in APPLICATION_COLUMNS] + [record.get(ID_COLUMN) or new_application_id()]
+                for record in records]
+        with self._lock, self._connection:
+            if skip_duplicates:
+                rows = self._without_duplicates(rows)
+            new_rows = [row for row in rows if row is not None]
+            self._connection.executemany(_INSERT_APPLICATION, new_rows)
+            self._log_changes([("add", row[0], row[-1], {"row": row}) for row in new_rows])
+        return [None if row is None else row[-1] for row in rows]
+
+    def _without_duplicates(self, rows):
+        seen = set()
+        kept = []
+        for row in rows:
+            key = _dedup_key(*row[:4])
+            if key in seen or self._connection.execute(
+                    "SELECT 1 FROM applications WHERE dedup_key = ? LIMIT 1", (key,)).fetchone():
+                kept.append(None)
+            else:
+                seen.add(key)
+                kept.append(row)
+        return kept
+
+    def delete(self, username, application_id):
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "DELETE FROM applications WHERE user_name = ? AND application_id = ?",
+                (username, str(application_id)))
+            if cursor.rowcount:
+                self._log_changes([("delete", username, str(application_id), None)])
+        return cursor.rowcount
+
+    def update_status(self, username, application_id, status):
+        with self._lock, self._connection:
+            found = self._connection.execute(
+                "SELECT status FROM applications WHERE user_name = ? AND application_id = ?",
+                (username, str(application_id))).fetchone()
+            if found and found[0] != status:
+                self._connection.execute(
+                    "UPDATE applications SET status = ? WHERE user_name = ? AND application_id = ?",
+                    (status, username, str(application_id)))
+                self._log_changes([("status", username, str(application_id), {"status": status})])
+        return 1 if found else 0
+
+    # Record (op, user, id, extra fields) changes; runs inside the caller's transaction
+    def _log_changes(self, changes):
+        changed_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        self._connection.executemany(
+            "INSERT INTO changes (changed_at, op, user_name, application_id, data) VALUES (?, ?, ?, ?, ?)",
+            [(changed_at, op, user, application_id, json.dumps(extra) if extra else None)
+             for op, user, application_id, extra in changes])
+
+    # Same result as ApplicationStore.changes_since
+    def changes_since(self, username, since=0):
+        with self._lock:
+            # Both reads in one transaction, so no change falls between them
+            self._connection.execute("BEGIN")
+            try:
+                rows = self._connection.execute(
+                    "SELECT seq, changed_at, op, application_id, data FROM changes "
+                    "WHERE user_name = ? AND seq > ? ORDER BY seq", (username, since)).fetchall()
+                latest = self._connection.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+            finally:
+                self._connection.execute("COMMIT")
+        changes = [{"seq": seq, "time": changed_at, "op": op, "user": username, "id": application_id,
+                    **(json.loads(data) if data else {})}
+                   for seq, changed_at, op, application_id, data in rows]
+        return changes, max(since, latest)
+
+    # Both reads in one transaction, so they see the same moment
+    def change_snapshot(self, username):
+        with self._lock:
+            self._connection.execute("BEGIN")
+            try:
+                rows = pd.read_sql_query(_SELECT_APPLICATIONS + "WHERE user_name = ? ORDER BY id", self._connection,
+                                         params=(username,), dtype=str)
+                latest = self._connection.execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+            finally:
+                self._connection.execute("COMMIT")
+        return rows, latest
+
+
+# Credentials table with the same interface as CsvCredentialStore
+class SqliteCredentialStore:
+    def __init__(self, path):
+        self.path = path
+        self._connection = connect(path)
+        self._lock = threading.Lock()
+
+    def lookup(self, username):
+        with self._lock:
+            return self._connection.execute(
+                "SELECT salt, password_hash FROM credentials WHERE username = ?",
+                (username,)).fetchone()
+
+    def exists(self, username):
+        return self.lookup(username) is not None
+
+    # Returns True if the user was added, False if the name is taken
+    def add(self, username, salt, password_hash):
+        with self._lock, self._connection:
+            cursor = self._connection.execute(
+                "INSERT OR IGNORE INTO credentials (username, salt, password_hash) VALUES (?, ?, ?)",
+                (username, salt, password_hash))
+        return cursor.rowcount == 1
+
+
+# One-shot copy of the CSV files into a new database.
+# Refuses to run twice so rows are never imported in duplicate.
+def migrate_csv_to_sqlite(csv_path, credentials_path, database_path):
+    connection = connect(database_path)
+    try:
+        if connection.execute("SELECT 1 FROM applications LIMIT 1").fetchone() or \
+                connection.execute("SELECT 1 FROM credentials LIMIT 1").fetchone():
+            raise RuntimeError(f"{database_path} already contains data; refusing to migrate again")
+
+        # Loading through ApplicationStore assigns missing IDs and drops deleted rows
+        applications = ApplicationStore(csv_path).df
+        try:
+            credentials = pd.read_csv(credentials_path, dtype=str)
+        except FileNotFoundError:
+            credentials = pd.DataFrame(columns=["Username", "Salt", "PasswordHash"])
+
+        with connection:
+            connection.executemany(_INSERT_APPLICATION,
+                                   applications[APPLICATION_COLUMNS + [ID_COLUMN]].itertuples(index=False, name=None))
+            connection.executemany(
+                "INSERT INTO credentials (username, salt, password_hash) VALUES (?, ?, ?)",
+                credentials[["Username", "Salt", "PasswordHash"]].itertuples(index=False, name=None))
+        return len(applications), len(credentials)
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate the tracker CSV files into a SQLite database.")
+    parser.add_argument("--csv", default="job_applications.csv")
+    parser.add_argument("--credentials", default="credentials.csv")
+    parser.add_argument("--db", default="job_tracker.db")
+    args = parser.parse_args()
+
+    application_count, user_count = migrate_csv_to_sqlite(args.csv, args.credentials, args.db)
+    print(f"Migrated {application_count} applications and {user_count} users into {args.db}")
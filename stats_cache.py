@@ -0,0 +1,89 @@
+from collections import Counter, defaultdict
+import numpy as np
+import pandas as pd
+
+# 1970-01-01 was a Thursday: weekday() == 3 with Monday == 0
+_EPOCH_WEEKDAY = 3
+
+
+# Sunday that ends the week of each date, matching pd.Grouper(freq='W')
+def week_ending(dates):
+    days = np.asarray(dates, dtype="datetime64[D]")
+    weekday = (days.astype(np.int64) + _EPOCH_WEEKDAY) % 7
+    return days + (6 - weekday).astype("timedelta64[D]")
+
+
+# Weekly status counts and status totals for one user, kept up to date as
+# applications are added or removed so charts cost O(weeks), not O(rows)
+class StatusStatistics:
+    def __init__(self):
+        self.weekly = defaultdict(Counter)
+        self.totals = Counter()
+
+    # Build from parallel arrays of dates and statuses (optionally pre-counted).
+    # Categorical statuses are grouped by their integer codes.
+    @classmethod
+    def build(cls, dates, statuses, counts=None):
+        statistics = cls()
+        dates = np.asarray(dates, dtype="datetime64[ns]")
+        if not isinstance(statuses, pd.Categorical):
+            statuses = np.asarray(statuses, dtype=object)
+        counts = np.ones(len(dates), dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+        frame = pd.DataFrame({"Status": statuses, "Count": counts})
+        for status, count in frame.groupby("Status", sort=False, observed=True)["Count"].sum().items():
+            statistics.totals[status] += int(count)
+
+        dated = ~np.isnat(dates)
+        frame = pd.DataFrame({"Week": week_ending(dates[dated]), "Status": statuses[dated], "Count": counts[dated]})
+        for (week, status), count in frame.groupby(["Week", "Status"], sort=False, observed=True)["Count"].sum().items():
+            statistics.weekly[np.datetime64(week, "D")][status] += int(count)
+        return statistics
+
+    # Independent copy, safe to read while the original keeps changing
+    def copy(self):
+        statistics = StatusStatistics()
+        statistics.weekly.update({week: Counter(counts) for week, counts in self.weekly.items()})
+        statistics.totals.update(self.totals)
+        return statistics
+
+    # Add the counts of other, e.g. statistics built from another chunk of rows
+    def update(self, other):
+        for week, counts in other.weekly.items():
+            self.weekly[week].update(counts)
+        self.totals.update(other.totals)
+
+    def add(self, date, status, count=1):
+        date = pd.Timestamp(date).to_datetime64()
+        self.totals[status] += count
+        if not np.isnat(date):
+            self.weekly[week_ending([date])[0]][status] += count
+
+    def remove(self, date, status, count=1):
+        date = pd.Timestamp(date).to_datetime64()
+        self.add(date, status, -count)
+        if self.totals[status] <= 0:
+            del self.totals[status]
+        if not np.isnat(date):
+            week = week_ending([date])[0]
+            if self.weekly[week][status] <= 0:
+                del self.weekly[week][status]
+            if not self.weekly[week]:
+                del self.weekly[week]
+
+    # Cumulative applications per status at the end of every week
+    def progression(self):
+        if not self.weekly:
+            return pd.DataFrame()
+        weeks = sorted(self.weekly)
+        counts = pd.DataFrame.from_dict({week: self.weekly[week] for week in weeks}, orient="index")
+        counts.index = pd.DatetimeIndex(counts.index, name="Date Applied")
+        full_range = pd.date_range(counts.index[0], counts.index[-1], freq="W", name="Date Applied")
+        counts = counts.reindex(full_range, fill_value=0).fillna(0).astype(np.int64)
+        counts = counts[sorted(counts.columns)]
+        counts.columns.name = "Status"
+        return counts.cumsum()
+
+    # Totals per status, largest first (like value_counts)
+    def status_counts(self):
+        return pd.Series(dict(self.totals.most_common()), name="count", dtype=np.int64)